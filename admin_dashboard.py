@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
 import os
-import time
+import sqlite3
+import itertools
+from pathlib import Path
 
 from auth.database import Database
 
@@ -61,8 +61,193 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Number of read-only connections used by the dashboard queries
+READ_POOL_SIZE = 4
+
+@st.cache_resource
+def get_db():
+    """Open the shared database once per server process"""
+    return Database()
+
+@st.cache_resource
+def _read_pool():
+    """Open a small round-robin pool of read-only connections"""
+    uri = Path(get_db().db_path).resolve().as_uri() + "?mode=ro"
+    return itertools.cycle([
+        sqlite3.connect(uri, uri=True, check_same_thread=False)
+        for _ in range(READ_POOL_SIZE)
+    ])
+
+def _read_conn():
+    """Get the next read-only connection from the pool"""
+    return next(_read_pool())
+
 # Initialize database
-db = Database()
+db = get_db()
+
+# Colours used for pie chart slices
+PIE_COLORS = ['#0077b6', '#00b4d8', '#90e0ef']
+
+def _pie_chart(data, label_column, value_column):
+    """Build a pie chart that is rendered client-side by Vega-Lite"""
+    # Only the Overview and Usage Analytics pages draw charts
+    import altair as alt
+    
+    return alt.Chart(data).mark_arc().encode(
+        theta=alt.Theta(f"{value_column}:Q"),
+        color=alt.Color(f"{label_column}:N", scale=alt.Scale(range=PIE_COLORS)),
+        tooltip=[label_column, value_column],
+    )
+
+# SQL used by the dashboard, defined once so each statement text is identical across reruns
+_SQL_OVERVIEW = """
+SELECT (SELECT COUNT(*) FROM users),
+       COALESCE(SUM(CASE WHEN active = 1 THEN 1 ELSE 0 END), 0),
+       COALESCE(SUM(runs_used), 0),
+       COALESCE(SUM(CASE WHEN plan_type = 'basic' THEN 1 ELSE 0 END), 0),
+       COALESCE(SUM(CASE WHEN plan_type = 'premium' THEN 1 ELSE 0 END), 0)
+FROM subscriptions
+"""
+
+_SQL_SUBSCRIPTION_DISTRIBUTION = "SELECT plan_type, COUNT(*) FROM subscriptions GROUP BY plan_type"
+
+_SQL_RECENT_ACTIVITY = """
+SELECT u.username, s.plan_type, datetime(l.timestamp, 'unixepoch', 'localtime') as timestamp, l.symbol
+FROM usage_logs l
+JOIN users u ON l.user_id = u.id
+JOIN subscriptions s ON l.subscription_id = s.id
+ORDER BY l.timestamp DESC
+LIMIT 10
+"""
+
+_SQL_USERS = """
+SELECT u.id, u.username, u.email,
+       date(u.created_at, 'unixepoch', 'localtime') as created_at,
+       date(u.last_login, 'unixepoch', 'localtime') as last_login,
+       COALESCE(a.cnt, 0) as has_active_sub
+FROM users u
+LEFT JOIN (
+    SELECT user_id, COUNT(*) as cnt
+    FROM subscriptions
+    WHERE active = 1
+    GROUP BY user_id
+) a ON a.user_id = u.id
+ORDER BY u.created_at DESC
+"""
+
+_SQL_SUBSCRIPTIONS = """
+SELECT s.id, u.username, s.plan_type,
+       date(s.start_date, 'unixepoch', 'localtime') as start_date,
+       date(s.end_date, 'unixepoch', 'localtime') as end_date,
+       s.runs_allowed, s.runs_used, s.active
+FROM subscriptions s
+JOIN users u ON s.user_id = u.id
+ORDER BY s.start_date DESC
+"""
+
+_SQL_SYMBOL_USAGE = """
+SELECT symbol, COUNT(*) as count
+FROM usage_logs
+GROUP BY symbol
+ORDER BY count DESC
+"""
+
+_SQL_PLAN_USAGE = """
+SELECT s.plan_type, COUNT(*) as count
+FROM usage_logs l
+JOIN subscriptions s ON l.subscription_id = s.id
+GROUP BY s.plan_type
+ORDER BY count DESC
+"""
+
+_SQL_TIME_USAGE = """
+SELECT date(timestamp, 'unixepoch', 'localtime') as date, COUNT(*) as count
+FROM usage_logs
+GROUP BY date
+ORDER BY date
+"""
+
+_SQL_TOP_USERS = """
+SELECT u.username, COUNT(*) as count
+FROM usage_logs l
+JOIN users u ON l.user_id = u.id
+GROUP BY u.username
+ORDER BY count DESC
+LIMIT 10
+"""
+
+_SQL_DEACTIVATE_USER_SUBSCRIPTIONS = "UPDATE subscriptions SET active = 0 WHERE user_id = ?"
+_SQL_DEACTIVATE_SUBSCRIPTION = "UPDATE subscriptions SET active = 0 WHERE id = ?"
+_SQL_ADD_RUNS = "UPDATE subscriptions SET runs_allowed = runs_allowed + ? WHERE id = ?"
+
+# Cached read-only queries (invalidated with _invalidate_data() after writes)
+@st.cache_data(ttl=30)
+def _overview_metrics():
+    """Get user count, active subscriptions, total runs and plan counts"""
+    return tuple(_read_conn().execute(_SQL_OVERVIEW).fetchone())
+
+@st.cache_data(ttl=30)
+def _subscription_distribution():
+    """Get the number of subscriptions per plan type"""
+    return _read_conn().execute(_SQL_SUBSCRIPTION_DISTRIBUTION).fetchall()
+
+@st.cache_data(ttl=30)
+def _recent_activity():
+    """Get the 10 most recent usage log entries"""
+    return pd.read_sql_query(_SQL_RECENT_ACTIVITY, _read_conn())
+
+@st.cache_data(ttl=30)
+def _all_users():
+    """Get all users with their active subscription count"""
+    return pd.read_sql_query(_SQL_USERS, _read_conn())
+
+@st.cache_data(ttl=30)
+def _all_subscriptions():
+    """Get all subscriptions with their usernames"""
+    return pd.read_sql_query(_SQL_SUBSCRIPTIONS, _read_conn())
+
+@st.cache_data(ttl=30)
+def _symbol_usage():
+    """Get the number of analyses per symbol"""
+    return _read_conn().execute(_SQL_SYMBOL_USAGE).fetchall()
+
+@st.cache_data(ttl=30)
+def _plan_usage():
+    """Get the number of analyses per plan type"""
+    return _read_conn().execute(_SQL_PLAN_USAGE).fetchall()
+
+@st.cache_data(ttl=30)
+def _time_usage():
+    """Get the number of analyses per day"""
+    return _read_conn().execute(_SQL_TIME_USAGE).fetchall()
+
+@st.cache_data(ttl=30)
+def _top_users():
+    """Get the 10 users with the most analyses"""
+    return pd.read_sql_query(_SQL_TOP_USERS, _read_conn())
+
+# Tables kept in session state so widget-only reruns skip the query entirely
+_SESSION_TABLES = {
+    "users_df": _all_users,
+    "subscriptions_df": _all_subscriptions
+}
+
+def _session_table(key):
+    """Get a table from session state, loading it on first use or after a write"""
+    if key not in st.session_state:
+        st.session_state[key] = _SESSION_TABLES[key]()
+    return st.session_state[key]
+
+def _invalidate_data():
+    """Drop cached query results after a write"""
+    st.cache_data.clear()
+    for key in _SESSION_TABLES:
+        st.session_state.pop(key, None)
+
+@st.cache_data
+def _to_csv(data):
+    """Encode a table as CSV for the download buttons"""
+    return data.to_csv(index=False).encode("utf-8")
 
 # Admin authentication
 def admin_login():
@@ -81,8 +266,7 @@ def admin_login():
             # Make sure to use the exact credentials: admin/admin123
             if username.strip() == "admin" and password.strip() == "admin123":
                 st.session_state.admin_authenticated = True
-                st.success("Login successful!")
-                time.sleep(1)
+                st.toast("Login successful!", icon="✅")
                 st.rerun()
             else:
                 st.error("Invalid username or password")
@@ -100,6 +284,10 @@ def main():
     st.sidebar.header("Navigation")
     page = st.sidebar.selectbox("Select Page", ["Overview", "Users", "Subscriptions", "Usage Analytics"])
     
+    # Refresh button
+    if st.sidebar.button("Refresh Data"):
+        _invalidate_data()
+    
     # Logout button
     if st.sidebar.button("Logout"):
         st.session_state.admin_authenticated = False
@@ -120,28 +308,9 @@ def display_overview():
     st.header("Overview")
     
     # Get data from database
-    conn = db.conn
-    cursor = conn.cursor()
-    
-    # Get user count
-    cursor.execute("SELECT COUNT(*) FROM users")
-    user_count = cursor.fetchone()[0]
-    
-    # Get active subscriptions count
-    cursor.execute("SELECT COUNT(*) FROM subscriptions WHERE active = 1")
-    active_subscriptions = cursor.fetchone()[0]
-    
-    # Get total runs
-    cursor.execute("SELECT SUM(runs_used) FROM subscriptions")
-    total_runs = cursor.fetchone()[0] or 0
-    
+    user_count, active_subscriptions, total_runs, basic_count, premium_count = _overview_metrics()
+
     # Get revenue (simulated)
-    cursor.execute("SELECT COUNT(*) FROM subscriptions WHERE plan_type = 'basic'")
-    basic_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM subscriptions WHERE plan_type = 'premium'")
-    premium_count = cursor.fetchone()[0]
-    
     revenue = basic_count * 100 + premium_count * 500
     
     # Display metrics
@@ -163,48 +332,34 @@ def display_overview():
     st.subheader("Subscription Distribution")
     
     # Get subscription data
-    cursor.execute("SELECT plan_type, COUNT(*) FROM subscriptions GROUP BY plan_type")
-    subscription_data = cursor.fetchall()
+    subscription_data = _subscription_distribution()
     
     if subscription_data:
         # Create pie chart
-        fig, ax = plt.subplots(figsize=(8, 6))
-        labels = [row[0] for row in subscription_data]
-        sizes = [row[1] for row in subscription_data]
-        colors = ['#0077b6', '#00b4d8', '#90e0ef']
-        
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors, startangle=90)
-        ax.axis('equal')
-        
-        st.pyplot(fig)
+        chart_data = pd.DataFrame(subscription_data, columns=["Plan", "Subscriptions"])
+        st.altair_chart(_pie_chart(chart_data, "Plan", "Subscriptions"), use_container_width=True)
     else:
         st.info("No subscription data available")
     
     # Recent activity
     st.subheader("Recent Activity")
     
-    cursor.execute("""
-    SELECT u.username, s.plan_type, l.timestamp, l.symbol
-    FROM usage_logs l
-    JOIN users u ON l.user_id = u.id
-    JOIN subscriptions s ON l.subscription_id = s.id
-    ORDER BY l.timestamp DESC
-    LIMIT 10
-    """)
-    
-    recent_activity = cursor.fetchall()
-    
-    if recent_activity:
-        activity_data = []
-        for row in recent_activity:
-            activity_data.append({
-                "Username": row[0],
-                "Plan": row[1],
-                "Timestamp": datetime.fromisoformat(row[2]).strftime("%Y-%m-%d %H:%M:%S"),
-                "Symbol": row[3]
-            })
+    recent_activity = _recent_activity()
+    
+    if not recent_activity.empty:
+        activity_data = pd.DataFrame({
+            "Username": recent_activity["username"],
+            "Plan": recent_activity["plan_type"],
+            "Timestamp": pd.to_datetime(recent_activity["timestamp"], format="ISO8601"),
+            "Symbol": recent_activity["symbol"]
+        })
         
-        st.table(pd.DataFrame(activity_data))
+        st.dataframe(
+            activity_data,
+            hide_index=True,
+            use_container_width=True,
+            column_config={"Timestamp": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm:ss")}
+        )
     else:
         st.info("No recent activity")
 
@@ -216,81 +371,59 @@ def display_users():
     conn = db.conn
     cursor = conn.cursor()
     
-    cursor.execute("""
-    SELECT u.id, u.username, u.email, u.created_at, u.last_login,
-           (SELECT COUNT(*) FROM subscriptions s WHERE s.user_id = u.id AND s.active = 1) as has_active_sub
-    FROM users u
-    ORDER BY u.created_at DESC
-    """)
-    
-    users = cursor.fetchall()
-    
-    if users:
-        user_data = []
-        for row in users:
-            created_at = datetime.fromisoformat(row[3]).strftime("%Y-%m-%d")
-            last_login = row[4]
-            if last_login:
-                last_login = datetime.fromisoformat(last_login).strftime("%Y-%m-%d")
-            else:
-                last_login = "Never"
-            
-            user_data.append({
-                "ID": row[0],
-                "Username": row[1],
-                "Email": row[2],
-                "Created": created_at,
-                "Last Login": last_login,
-                "Active Subscription": "Yes" if row[5] > 0 else "No"
-            })
+    users = _session_table("users_df")
+    
+    if not users.empty:
+        # The query already formats the epoch timestamps as YYYY-MM-DD dates
+        user_data = pd.DataFrame({
+            "ID": users["id"],
+            "Username": users["username"],
+            "Email": users["email"],
+            "Created": users["created_at"],
+            "Last Login": users["last_login"].fillna("Never"),
+            "Active Subscription": users["has_active_sub"].gt(0).map({True: "Yes", False: "No"})
+        })
         
         # Display user table
-        st.dataframe(pd.DataFrame(user_data))
+        max_rows = st.sidebar.slider("Rows to display", 50, 1000, 200)
+        st.dataframe(user_data.head(max_rows), hide_index=True, use_container_width=True)
+        st.download_button("Download full CSV", _to_csv(user_data), file_name="users.csv", mime="text/csv")
         
         # User actions
         st.subheader("User Actions")
         
+        # Map user IDs to selectbox labels once for both actions
+        user_labels = dict(zip(users["id"], users["username"] + " (" + users["email"] + ")"))
+        
         col1, col2 = st.columns(2)
         
         with col1:
             # Delete user
             st.subheader("Delete User")
-            user_options = [f"{u[1]} ({u[2]})" for u in users]
-            selected_user = st.selectbox("Select User", user_options, key="delete_user")
-            # Find the index of the selected user
-            selected_index = user_options.index(selected_user)
-            selected_user_id = users[selected_index][0]
+            selected_user_id = st.selectbox("Select User", list(user_labels), format_func=user_labels.get, key="delete_user")
             
             if st.button("Delete User"):
                 # In a real application, you would want to confirm this action
-                cursor.execute("DELETE FROM sessions WHERE user_id = ?", (selected_user_id,))
-                cursor.execute("DELETE FROM usage_logs WHERE user_id = ?", (selected_user_id,))
-                cursor.execute("DELETE FROM subscriptions WHERE user_id = ?", (selected_user_id,))
-                cursor.execute("DELETE FROM users WHERE id = ?", (selected_user_id,))
-                conn.commit()
+                db.delete_user(selected_user_id)
                 
-                st.success("User deleted successfully!")
-                time.sleep(1)
+                _invalidate_data()
+                st.toast("User deleted successfully!", icon="✅")
                 st.rerun()
         
         with col2:
             # Add free trial
             st.subheader("Add Free Trial")
-            user_options = [f"{u[1]} ({u[2]})" for u in users]
-            selected_user = st.selectbox("Select User", user_options, key="add_trial")
-            # Find the index of the selected user
-            selected_index = user_options.index(selected_user)
-            selected_user_id = users[selected_index][0]
+            selected_user_id = st.selectbox("Select User", list(user_labels), format_func=user_labels.get, key="add_trial")
             
             if st.button("Add Free Trial"):
                 # Deactivate existing subscriptions
-                cursor.execute("UPDATE subscriptions SET active = 0 WHERE user_id = ?", (selected_user_id,))
+                cursor.execute(_SQL_DEACTIVATE_USER_SUBSCRIPTIONS, (selected_user_id,))
                 
                 # Create new free trial
                 subscription_id = db.create_free_trial(selected_user_id)
                 
-                st.success("Free trial added successfully!")
-                time.sleep(1)
+                _invalidate_data()
+                st.toast("Free trial added successfully!", icon="✅")
                 st.rerun()
     else:
         st.info("No users found")
@@ -303,84 +436,64 @@ def display_subscriptions():
     conn = db.conn
     cursor = conn.cursor()
     
-    cursor.execute("""
-    SELECT s.id, u.username, s.plan_type, s.start_date, s.end_date, s.runs_allowed, s.runs_used, s.active
-    FROM subscriptions s
-    JOIN users u ON s.user_id = u.id
-    ORDER BY s.start_date DESC
-    """)
-    
-    subscriptions = cursor.fetchall()
-    
-    if subscriptions:
-        subscription_data = []
-        for row in subscriptions:
-            start_date = datetime.fromisoformat(row[3]).strftime("%Y-%m-%d")
-            end_date = row[4]
-            if end_date:
-                end_date = datetime.fromisoformat(end_date).strftime("%Y-%m-%d")
-            else:
-                end_date = "No expiration"
-            
-            subscription_data.append({
-                "ID": row[0],
-                "Username": row[1],
-                "Plan": row[2],
-                "Start Date": start_date,
-                "End Date": end_date,
-                "Runs": f"{row[6]}/{row[5]}",
-                "Status": "Active" if row[7] else "Inactive"
-            })
+    subscriptions = _session_table("subscriptions_df")
+    
+    if not subscriptions.empty:
+        # The query already formats the epoch timestamps as YYYY-MM-DD dates
+        subscription_data = pd.DataFrame({
+            "ID": subscriptions["id"],
+            "Username": subscriptions["username"],
+            "Plan": subscriptions["plan_type"],
+            "Start Date": subscriptions["start_date"],
+            "End Date": subscriptions["end_date"].fillna("No expiration"),
+            "Runs": subscriptions["runs_used"].astype(str) + "/" + subscriptions["runs_allowed"].astype(str),
+            "Status": subscriptions["active"].astype(bool).map({True: "Active", False: "Inactive"})
+        })
         
         # Display subscription table
-        st.dataframe(pd.DataFrame(subscription_data))
+        max_rows = st.sidebar.slider("Rows to display", 50, 1000, 200)
+        st.dataframe(subscription_data.head(max_rows), hide_index=True, use_container_width=True)
+        st.download_button("Download full CSV", _to_csv(subscription_data), file_name="subscriptions.csv", mime="text/csv")
         
         # Subscription actions
         st.subheader("Subscription Actions")
         
+        # Map active subscription IDs to selectbox labels once for both actions
+        active_subs = subscriptions[subscriptions["active"].astype(bool)]
+        sub_labels = dict(zip(active_subs["id"], active_subs["username"] + " - " + active_subs["plan_type"] + " (" + active_subs["id"] + ")"))
+        
         col1, col2 = st.columns(2)
         
         with col1:
             # Deactivate subscription
             st.subheader("Deactivate Subscription")
-            active_subs = [s for s in subscriptions if s[7]]
-            if active_subs:
-                sub_options = [f"{s[1]} - {s[2]} ({s[0]})" for s in active_subs]
-                selected_sub = st.selectbox("Select Subscription", sub_options, key="deactivate_sub")
-                # Find the index of the selected subscription
-                selected_index = sub_options.index(selected_sub)
-                selected_sub_id = active_subs[selected_index][0]
+            if sub_labels:
+                selected_sub_id = st.selectbox("Select Subscription", list(sub_labels), format_func=sub_labels.get, key="deactivate_sub")
                 
                 if st.button("Deactivate"):
                     
-                    cursor.execute("UPDATE subscriptions SET active = 0 WHERE id = ?", (selected_sub_id,))
+                    cursor.execute(_SQL_DEACTIVATE_SUBSCRIPTION, (selected_sub_id,))
                     conn.commit()
                     
-                    st.success("Subscription deactivated successfully!")
-                    time.sleep(1)
+                    _invalidate_data()
+                    st.toast("Subscription deactivated successfully!", icon="✅")
                     st.rerun()
         
         with col2:
             # Add runs to subscription
             st.subheader("Add Runs")
-            active_subs = [s for s in subscriptions if s[7]]
-            if active_subs:
-                sub_options = [f"{s[1]} - {s[2]} ({s[0]})" for s in active_subs]
-                selected_sub = st.selectbox("Select Subscription", sub_options, key="add_runs")
-                # Find the index of the selected subscription
-                selected_index = sub_options.index(selected_sub)
-                selected_sub_id = active_subs[selected_index][0]
+            if sub_labels:
+                selected_sub_id = st.selectbox("Select Subscription", list(sub_labels), format_func=sub_labels.get, key="add_runs")
                 
                 runs_to_add = st.number_input("Runs to Add", min_value=1, max_value=100, value=10)
                 
                 if st.button("Add Runs"):
                     
-                    cursor.execute("UPDATE subscriptions SET runs_allowed = runs_allowed + ? WHERE id = ?", 
-                                  (runs_to_add, selected_sub_id))
+                    cursor.execute(_SQL_ADD_RUNS, (runs_to_add, selected_sub_id))
                     conn.commit()
                     
-                    st.success(f"Added {runs_to_add} runs to subscription!")
-                    time.sleep(1)
+                    _invalidate_data()
+                    st.toast(f"Added {runs_to_add} runs to subscription!", icon="✅")
                     st.rerun()
     else:
         st.info("No subscriptions found")
@@ -389,110 +502,47 @@ def display_usage_analytics():
     """Display usage analytics page"""
     st.header("Usage Analytics")
     
-    # Get usage data from database
-    conn = db.conn
-    cursor = conn.cursor()
-    
     # Get usage by symbol
-    cursor.execute("""
-    SELECT symbol, COUNT(*) as count
-    FROM usage_logs
-    GROUP BY symbol
-    ORDER BY count DESC
-    """)
-    
-    symbol_usage = cursor.fetchall()
+    symbol_usage = _symbol_usage()
     
     if symbol_usage:
         st.subheader("Usage by Symbol")
         
         # Create bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
-        symbols = [row[0] for row in symbol_usage]
-        counts = [row[1] for row in symbol_usage]
-        
-        ax.bar(symbols, counts, color='#0077b6')
-        ax.set_xlabel('Symbol')
-        ax.set_ylabel('Number of Analyses')
-        ax.set_title('Usage by Symbol')
-        
-        st.pyplot(fig)
+        chart_data = pd.DataFrame(symbol_usage, columns=["Symbol", "Number of Analyses"])
+        st.bar_chart(chart_data, x="Symbol", y="Number of Analyses", color="#0077b6")
     
     # Get usage by plan type
-    cursor.execute("""
-    SELECT s.plan_type, COUNT(*) as count
-    FROM usage_logs l
-    JOIN subscriptions s ON l.subscription_id = s.id
-    GROUP BY s.plan_type
-    ORDER BY count DESC
-    """)
-    
-    plan_usage = cursor.fetchall()
+    plan_usage = _plan_usage()
     
     if plan_usage:
         st.subheader("Usage by Plan Type")
         
         # Create pie chart
-        fig, ax = plt.subplots(figsize=(8, 6))
-        plans = [row[0] for row in plan_usage]
-        counts = [row[1] for row in plan_usage]
-        colors = ['#0077b6', '#00b4d8', '#90e0ef']
-        
-        ax.pie(counts, labels=plans, autopct='%1.1f%%', colors=colors, startangle=90)
-        ax.axis('equal')
-        
-        st.pyplot(fig)
+        chart_data = pd.DataFrame(plan_usage, columns=["Plan", "Number of Analyses"])
+        st.altair_chart(_pie_chart(chart_data, "Plan", "Number of Analyses"), use_container_width=True)
     
     # Get usage over time
-    cursor.execute("""
-    SELECT DATE(timestamp) as date, COUNT(*) as count
-    FROM usage_logs
-    GROUP BY DATE(timestamp)
-    ORDER BY date
-    """)
-    
-    time_usage = cursor.fetchall()
+    time_usage = _time_usage()
     
     if time_usage:
         st.subheader("Usage Over Time")
         
         # Create line chart
-        fig, ax = plt.subplots(figsize=(12, 6))
-        dates = [row[0] for row in time_usage]
-        counts = [row[1] for row in time_usage]
-        
-        ax.plot(dates, counts, marker='o', linestyle='-', color='#0077b6')
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Number of Analyses')
-        ax.set_title('Usage Over Time')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        st.pyplot(fig)
+        chart_data = pd.DataFrame(time_usage, columns=["Date", "Number of Analyses"])
+        st.line_chart(chart_data, x="Date", y="Number of Analyses", color="#0077b6")
     
     # Top users
-    cursor.execute("""
-    SELECT u.username, COUNT(*) as count
-    FROM usage_logs l
-    JOIN users u ON l.user_id = u.id
-    GROUP BY u.username
-    ORDER BY count DESC
-    LIMIT 10
-    """)
-    
-    top_users = cursor.fetchall()
-    
-    if top_users:
+    top_users = _top_users()
+    
+    if not top_users.empty:
         st.subheader("Top Users")
         
-        user_data = []
-        for row in top_users:
-            user_data.append({
-                "Username": row[0],
-                "Analyses Run": row[1]
-            })
-        
-        st.table(pd.DataFrame(user_data))
+        st.dataframe(
+            top_users.rename(columns={"username": "Username", "count": "Analyses Run"}),
+            hide_index=True,
+            use_container_width=True
+        )
 
 # Run the app
 if not st.session_state.admin_authenticated:
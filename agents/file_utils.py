@@ -0,0 +1,27 @@
+import os
+import tempfile
+from typing import Any
+import orjson
+
+def write_json_atomic(path: str, data: Any, option: int = orjson.OPT_INDENT_2) -> None:
+    """
+    Write JSON to a file atomically
+    
+    The data is written to a temporary file in the same directory and then
+    moved over the target with os.replace, so readers never see a partial file.
+    
+    Args:
+        path: Destination file path
+        data: JSON-serializable data
+        option: orjson serialization options (indented by default)
+    """
+    payload = orjson.dumps(data, option=option)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
@@ -2,8 +2,15 @@ from agno.agent import Agent, RunResponse
 from agno.models.google import Gemini
 import os
 import json
-from typing import Dict, Any, List, Optional
+import orjson
+from typing import Dict, Any, List, Optional, Literal
+from pydantic import BaseModel
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from agents.file_utils import write_json_atomic
 
 # Import our tools
 from tools.chart_scraper.agno_tool import get_chart_data, get_all_timeframes, plot_chart, plot_all_charts
@@ -11,42 +18,36 @@ from tools.sentiment_analyzer.agno_tool import get_news, get_sentiment, summariz
 from tools.technical_indicators.agno_tool import format_indicators
 from tools.volume_profile.agno_tool import get_volume_profile
 
-# Get the API key from the .env file
-with open(os.path.join("agents", ".env"), "r") as f:
-    for line in f:
-        if line.startswith("GEMINI_API_KEY="):
-            gemini_api_key = line.strip().split("=")[1]
-            break
+# Get the API key from the environment, falling back to the agents .env file
+load_dotenv(os.path.join("agents", ".env"))
+gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+class TimeframePrediction(BaseModel):
+    """Schema for one timeframe of the structured Gemini response"""
+    timeframe: Literal["intraday", "5d", "30d"]
+    technical_analysis: str
+    sentiment_analysis: str
+    prediction_label: Literal["Buy", "Sell", "Hold"]
+    signal_strength: float
+    key_factors: List[str]
 
 # Initialize the agent
+# The response schema makes Gemini return a bare JSON array of predictions
 agent = Agent(
-    model=Gemini(id="gemini-2.0-flash-exp", api_key=gemini_api_key),
+    model=Gemini(
+        id="gemini-2.0-flash-exp",
+        api_key=gemini_api_key,
+        generation_config={
+            "response_mime_type": "application/json",
+            "response_schema": List[TimeframePrediction]
+        }
+    ),
     name="Gemini Futures Analyst",
-    role="Analyze futures markets (NQ, ES, YM) and make predictions based on chart data and market sentiment.",
-    markdown=True
+    role="Analyze futures markets (NQ, ES, YM) and make predictions based on chart data and market sentiment."
 )
 
-def analyze_futures(symbol: str) -> Dict[str, Any]:
-    """
-    Analyze futures for a specific symbol and make predictions
-    
-    Args:
-        symbol: The futures symbol (NQ, ES, YM)
-        
-    Returns:
-        Dictionary containing the analysis and predictions
-    """
-    # Create directories for predictions
-    predictions_dir = os.path.join("data", "predictions", "gemini", symbol)
-    os.makedirs(predictions_dir, exist_ok=True)
-    
-    # Get chart data, sentiment data, and volume profile
-    chart_data = get_all_timeframes(symbol)
-    sentiment_data = get_sentiment(symbol)
-    volume_profile_data = get_volume_profile(symbol, interval="1min")
-    
-    # Prepare the prompt for the agent
-    prompt = f"""
+# Analyst prompt, filled in per call with str.format_map
+PROMPT_TEMPLATE = """
     You are a futures market analyst specializing in technical analysis and market sentiment.
     
     Please analyze the {symbol} futures market and make predictions for the following timeframes:
@@ -102,13 +103,80 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
     
     Only respond with valid JSON.
     """
+
+# Timeframes every analysis must cover, in output order
+REQUIRED_TIMEFRAMES = ("intraday", "5d", "30d")
+REQUIRED_TIMEFRAME_SET = frozenset(REQUIRED_TIMEFRAMES)
+
+# Placeholder text for timeframes inferred from the other predictions
+INFERRED_TECHNICAL_ANALYSIS = "Analysis inferred from other timeframes. The {symbol} futures market shows similar patterns across timeframes."
+INFERRED_SENTIMENT_ANALYSIS = "Sentiment analysis inferred from other timeframes. Market sentiment for {symbol} is consistent across different time horizons."
+INFERRED_KEY_FACTORS = ("Inferred from other timeframes", "Similar market conditions", "Consistent sentiment")
+
+# Prediction directories already created in this process
+_created_dirs = set()
+
+def save_predictions(symbol: str, items: List[Dict[str, Any]], timestamp: str) -> None:
+    """
+    Save per-timeframe predictions for a symbol
+    
+    The files stay one per timeframe because MeanAnalyzer and view_results.py
+    read data/predictions/<agent>/<symbol>/<timeframe>.json.
+    
+    Args:
+        symbol: The futures symbol (NQ, ES, YM)
+        items: Prediction dictionaries, each with a "timeframe" key
+        timestamp: ISO timestamp shared by all predictions of the analysis
+    """
+    predictions_dir = os.path.join("data", "predictions", "gemini", symbol)
+    if predictions_dir not in _created_dirs:
+        os.makedirs(predictions_dir, exist_ok=True)
+        _created_dirs.add(predictions_dir)
+    
+    for item in items:
+        # Add metadata
+        item["symbol"] = symbol
+        item["agent"] = "gemini"
+        item["timestamp"] = timestamp
+        
+        # Save to file
+        write_json_atomic(os.path.join(predictions_dir, f"{item['timeframe']}.json"), item)
+
+def analyze_futures(symbol: str) -> Dict[str, Any]:
+    """
+    Analyze futures for a specific symbol and make predictions
+    
+    Args:
+        symbol: The futures symbol (NQ, ES, YM)
+        
+    Returns:
+        Dictionary containing the analysis and predictions
+    """
+    # Get chart data, sentiment data, and volume profile
+    # These are independent network calls, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        chart_future = executor.submit(get_all_timeframes, symbol)
+        sentiment_future = executor.submit(get_sentiment, symbol)
+        volume_profile_future = executor.submit(get_volume_profile, symbol, interval="1min")
+        chart_data = chart_future.result()
+        sentiment_data = sentiment_future.result()
+        volume_profile_data = volume_profile_future.result()
+    
+    # Prepare the prompt for the agent
+    prompt = PROMPT_TEMPLATE.format_map({
+        "symbol": symbol,
+        "chart_data": chart_data,
+        "sentiment_data": sentiment_data,
+        "volume_profile_data": volume_profile_data
+    })
     
     # Run the agent
     response = agent.run(prompt)
+    timestamp = datetime.now().isoformat()
     
     # Parse the response as JSON
     try:
-        analysis = json.loads(response.content)
+        analysis = orjson.loads(response.content)
         
         # Check if the analysis is a list
         if not isinstance(analysis, list):
@@ -121,81 +189,48 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
                 timeframe_predictions[item["timeframe"]] = item
         
         # Ensure we have predictions for all timeframes
-        required_timeframes = ["intraday", "5d", "30d"]
-        for timeframe in required_timeframes:
-            if timeframe not in timeframe_predictions:
-                # If we're missing a timeframe, try to infer it from the other predictions
-                if len(timeframe_predictions) > 0:
-                    # Use the most common prediction label
-                    labels = [item.get("prediction_label", "Hold") for item in timeframe_predictions.values()]
-                    most_common_label = max(set(labels), key=labels.count)
-                    
-                    # Use the average signal strength
-                    strengths = [item.get("signal_strength", 0.5) for item in timeframe_predictions.values()]
-                    avg_strength = sum(strengths) / len(strengths) if strengths else 0.5
-                    
-                    # Create a prediction for the missing timeframe
-                    timeframe_predictions[timeframe] = {
-                        "timeframe": timeframe,
-                        "technical_analysis": f"Analysis inferred from other timeframes. The {symbol} futures market shows similar patterns across timeframes.",
-                        "sentiment_analysis": f"Sentiment analysis inferred from other timeframes. Market sentiment for {symbol} is consistent across different time horizons.",
-                        "prediction_label": most_common_label,
-                        "signal_strength": avg_strength,
-                        "key_factors": ["Inferred from other timeframes", "Similar market conditions", "Consistent sentiment"]
-                    }
+        # If we're missing a timeframe, try to infer it from the other predictions
+        if timeframe_predictions and not REQUIRED_TIMEFRAME_SET <= timeframe_predictions.keys():
+            missing = [t for t in REQUIRED_TIMEFRAMES if t not in timeframe_predictions]
             
-        # Save the analysis to files
-        for timeframe, item in timeframe_predictions.items():
-            # Add metadata
-            item["symbol"] = symbol
-            item["agent"] = "gemini"
-            item["timestamp"] = datetime.now().isoformat()
+            # Use the most common prediction label
+            labels = [item.get("prediction_label", "Hold") for item in timeframe_predictions.values()]
+            most_common_label = Counter(labels).most_common(1)[0][0]
+            
+            # Use the average signal strength
+            strengths = [item.get("signal_strength", 0.5) for item in timeframe_predictions.values()]
+            avg_strength = sum(strengths) / len(strengths)
             
-            # Save to file
-            with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                json.dump(item, f, indent=2)
+            technical_analysis = INFERRED_TECHNICAL_ANALYSIS.format(symbol=symbol)
+            sentiment_analysis = INFERRED_SENTIMENT_ANALYSIS.format(symbol=symbol)
+            
+            # Create a prediction for each missing timeframe
+            for timeframe in missing:
+                timeframe_predictions[timeframe] = {
+                    "timeframe": timeframe,
+                    "technical_analysis": technical_analysis,
+                    "sentiment_analysis": sentiment_analysis,
+                    "prediction_label": most_common_label,
+                    "signal_strength": avg_strength,
+                    "key_factors": list(INFERRED_KEY_FACTORS)
+                }
+        
+        # Save the analysis to files
+        save_predictions(symbol, list(timeframe_predictions.values()), timestamp)
         
         # Update the analysis list with all timeframe predictions
         analysis = list(timeframe_predictions.values())
     except json.JSONDecodeError:
-        # If the response is not valid JSON, try to extract JSON from the response
-        import re
-        json_match = re.search(r'```json\n(.*?)\n```', response.content, re.DOTALL)
-        if json_match:
-            try:
-                analysis = json.loads(json_match.group(1))
-                
-                # Check if the analysis is a list
-                if not isinstance(analysis, list):
-                    analysis = [analysis]
-                
-                # Save the analysis to files
-                for item in analysis:
-                    if isinstance(item, dict) and "timeframe" in item:
-                        timeframe = item["timeframe"]
-                        # Add metadata
-                        item["symbol"] = symbol
-                        item["agent"] = "gemini"
-                        item["timestamp"] = datetime.now().isoformat()
-                        
-                        # Save to file
-                        with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                            json.dump(item, f, indent=2)
-            except json.JSONDecodeError:
-                analysis = [{
-                    "error": "Failed to parse JSON from response",
-                    "response": response.content
-                }]
-        else:
-            analysis = [{
-                "error": "Response is not valid JSON",
-                "response": response.content
-            }]
+        # Structured output should always parse; keep the raw text if it somehow doesn't
+        analysis = [{
+            "error": "Response is not valid JSON",
+            "response": response.content
+        }]
     
     return {
         "symbol": symbol,
         "analysis": analysis,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": timestamp
     }
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
 from agno.agent import Agent, RunResponse
 from agno.models.groq import Groq
 import os
+import re
 import json
+import orjson
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from dotenv import dotenv_values
+
+from agents.file_utils import write_json_atomic
 
 # Import our tools
 from tools.chart_scraper.agno_tool import get_chart_data, get_all_timeframes, plot_chart, plot_all_charts
@@ -11,13 +16,11 @@ from tools.sentiment_analyzer.agno_tool import get_news, get_sentiment, summariz
 from tools.technical_indicators.agno_tool import format_indicators
 from tools.volume_profile.agno_tool import get_volume_profile
 
-# Get the API key from the .env file
-with open(os.path.join("agents", ".env"), "r") as f:
-    for line in f:
-        if line.startswith("GROQ_API_KEY="):
-            groq_api_key = line.strip().split("=")[1]
-            os.environ["GROQ_API_KEY"] = groq_api_key
-            break
+# Get the API key from the environment, falling back to the agents .env file
+groq_api_key = os.environ.get("GROQ_API_KEY") or dotenv_values(os.path.join("agents", ".env")).get("GROQ_API_KEY")
+if not groq_api_key:
+    raise RuntimeError("GROQ_API_KEY is not set in the environment or in agents/.env")
+os.environ["GROQ_API_KEY"] = groq_api_key
 
 # Initialize the agent
 agent = Agent(
@@ -25,6 +28,9 @@ agent = Agent(
     markdown=True
 )
 
+# Fenced ```json block in a free-form model response
+JSON_BLOCK_PATTERN = re.compile(r'```json\s*\n(.*?)\n```', re.DOTALL)
+
 def analyze_futures(symbol: str) -> Dict[str, Any]:
     """
     Analyze futures for a specific symbol and make predictions
@@ -104,10 +110,11 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
     
     # Run the agent
     response = agent.run(prompt)
+    timestamp = datetime.now().isoformat()
     
     # Parse the response as JSON
     try:
-        analysis = json.loads(response.content)
+        analysis = orjson.loads(response.content)
         
         # Check if the analysis is a list
         if not isinstance(analysis, list):
@@ -148,21 +155,19 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
             # Add metadata
             item["symbol"] = symbol
             item["agent"] = "groq"
-            item["timestamp"] = datetime.now().isoformat()
+            item["timestamp"] = timestamp
             
             # Save to file
-            with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                json.dump(item, f, indent=2)
+            write_json_atomic(os.path.join(predictions_dir, f"{timeframe}.json"), item)
         
         # Update the analysis list with all timeframe predictions
         analysis = list(timeframe_predictions.values())
     except json.JSONDecodeError:
         # If the response is not valid JSON, try to extract JSON from the response
-        import re
-        json_match = re.search(r'```json\n(.*?)\n```', response.content, re.DOTALL)
+        json_match = JSON_BLOCK_PATTERN.search(response.content)
         if json_match:
             try:
-                analysis = json.loads(json_match.group(1))
+                analysis = orjson.loads(json_match.group(1))
                 
                 # Check if the analysis is a list
                 if not isinstance(analysis, list):
@@ -175,11 +180,10 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
                         # Add metadata
                         item["symbol"] = symbol
                         item["agent"] = "groq"
-                        item["timestamp"] = datetime.now().isoformat()
+                        item["timestamp"] = timestamp
                         
                         # Save to file
-                        with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                            json.dump(item, f, indent=2)
+                        write_json_atomic(os.path.join(predictions_dir, f"{timeframe}.json"), item)
             except json.JSONDecodeError:
                 analysis = [{
                     "error": "Failed to parse JSON from response",
@@ -194,7 +198,7 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
     return {
         "symbol": symbol,
         "analysis": analysis,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": timestamp
     }
 
 if __name__ == "__main__":
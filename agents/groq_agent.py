@@ -1,100 +1,69 @@
-from agno.agent import Agent, RunResponse
 import os
+import re
 import json
+import orjson
+import time
+import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from dotenv import dotenv_values
 import groq
 
+from agents.file_utils import write_json_atomic
+from tools.cache import cache_key, load_cached, save_cached
+
 # Import our tools
 from tools.chart_scraper.agno_tool import get_chart_data, get_all_timeframes, plot_chart, plot_all_charts
 from tools.sentiment_analyzer.agno_tool import get_news, get_sentiment, summarize_news
 
-# Get the API key from the .env file
-with open(os.path.join("agents", ".env"), "r") as f:
-    for line in f:
-        if line.startswith("GROQ_API_KEY="):
-            groq_api_key = line.strip().split("=")[1]
-            break
+# Get the API key from the environment, falling back to the agents .env file
+groq_api_key = os.environ.get("GROQ_API_KEY") or dotenv_values(os.path.join("agents", ".env")).get("GROQ_API_KEY")
+if not groq_api_key:
+    raise RuntimeError("GROQ_API_KEY is not set in the environment or in agents/.env")
 
 # Create a custom Groq client
-groq_client = groq.Groq(
+# The async client lets several symbols and timeframes wait on the API at the same time
+groq_client = groq.AsyncGroq(
     api_key=groq_api_key
 )
 
-# Create a custom Groq model class
-class GroqModel:
-    def __init__(self, id):
-        self.id = id
-        self.client = groq_client
-    
-    def response(self, messages):
-        try:
-            response = self.client.chat.completions.create(
-                model=self.id,
-                messages=[{"role": m.role, "content": m.content} for m in messages]
-            )
-            return RunResponse(content=response.choices[0].message.content)
-        except Exception as e:
-            raise Exception(f"Error calling Groq API: {e}")
-    
-    def get_instructions_for_model(self):
-        return ""
-    
-    def get_system_message_for_model(self):
-        return ""
+# Model and per-request output budget (one timeframe's analysis fits easily)
+MODEL_ID = "llama-3.3-70b-versatile"
+MAX_TOKENS = 1024
 
-# Initialize the agent
-agent = Agent(
-    model=GroqModel(id="llama-3.3-70b-versatile"),
-    name="Groq Futures Analyst",
-    role="Analyze futures markets (NQ, ES, YM) and make predictions based on chart data and market sentiment.",
-    markdown=True
-)
+# Timeframes analyzed for every symbol, one request each
+TIMEFRAMES = ["intraday", "5d", "30d"]
 
-def analyze_futures(symbol: str) -> Dict[str, Any]:
-    """
-    Analyze futures for a specific symbol and make predictions
-    
-    Args:
-        symbol: The futures symbol (NQ, ES, YM)
-        
-    Returns:
-        Dictionary containing the analysis and predictions
-    """
-    # Create directories for predictions
-    predictions_dir = os.path.join("data", "predictions", "groq", symbol)
-    os.makedirs(predictions_dir, exist_ok=True)
-    
-    # Get chart data and sentiment data
-    chart_data = get_all_timeframes(symbol)
-    sentiment_data = get_sentiment(symbol)
-    
-    # Prepare the prompt for the agent
-    prompt = f"""
+# Raw responses are reused for identical prompts within this many seconds,
+# stored with the other cached API responses by tools.cache
+CACHE_TTL = 300
+
+# Fenced ```json block in a free-form model response
+JSON_BLOCK_PATTERN = re.compile(r'```json\s*\n(.*?)\n```', re.DOTALL)
+
+# Analyst prompt for a single timeframe
+PROMPT_TEMPLATE = """
     You are a futures market analyst specializing in technical analysis and market sentiment.
     
-    Please analyze the {symbol} futures market and make predictions for the following timeframes:
-    - intraday
-    - 5d
-    - 30d
+    Please analyze the {symbol} futures market and make a prediction for the {timeframe} timeframe.
     
-    Here is the chart data for each timeframe:
+    Here is the chart data for this timeframe:
     
     {chart_data}
     
     Here is the sentiment data:
     {sentiment_data}
     
-    For each timeframe, provide:
+    Provide:
     1. A technical analysis of the chart data
     2. An analysis of the market sentiment
     3. A clear prediction (Buy, Sell, or Hold)
     4. A confidence score (0-1) for your prediction
     5. Key factors influencing your decision
     
-    Format your response as JSON with the following structure for each timeframe:
+    Format your response as a single JSON object with the following structure:
     {{
-        "timeframe": "timeframe_name",
+        "timeframe": "{timeframe}",
         "technical_analysis": "your detailed technical analysis",
         "sentiment_analysis": "your sentiment analysis",
         "prediction_label": "Buy/Sell/Hold",
@@ -104,82 +73,153 @@ def analyze_futures(symbol: str) -> Dict[str, Any]:
     
     Only respond with valid JSON.
     """
+
+def parse_response(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a model response into a prediction dictionary
     
-    # Run the agent
-    response = agent.run(prompt)
-    
-    # Parse the response as JSON
-    try:
-        analysis = json.loads(response.content)
+    Args:
+        content: The raw response text
         
-        # Check if the analysis is a list
-        if not isinstance(analysis, list):
-            analysis = [analysis]
-            
-        # Save the analysis to files
-        for item in analysis:
-            if isinstance(item, dict) and "timeframe" in item:
-                timeframe = item["timeframe"]
-                # Add metadata
-                item["symbol"] = symbol
-                item["agent"] = "groq"
-                item["timestamp"] = datetime.now().isoformat()
-                
-                # Save to file
-                with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                    json.dump(item, f, indent=2)
+    Returns:
+        The parsed prediction, or None if no JSON object could be extracted
+    """
+    try:
+        item = orjson.loads(content)
     except json.JSONDecodeError:
         # If the response is not valid JSON, try to extract JSON from the response
-        import re
-        json_match = re.search(r'```json\n(.*?)\n```', response.content, re.DOTALL)
-        if json_match:
-            try:
-                analysis = json.loads(json_match.group(1))
-                
-                # Check if the analysis is a list
-                if not isinstance(analysis, list):
-                    analysis = [analysis]
-                
-                # Save the analysis to files
-                for item in analysis:
-                    if isinstance(item, dict) and "timeframe" in item:
-                        timeframe = item["timeframe"]
-                        # Add metadata
-                        item["symbol"] = symbol
-                        item["agent"] = "groq"
-                        item["timestamp"] = datetime.now().isoformat()
-                        
-                        # Save to file
-                        with open(os.path.join(predictions_dir, f"{timeframe}.json"), "w") as f:
-                            json.dump(item, f, indent=2)
-            except json.JSONDecodeError:
-                analysis = [{
-                    "error": "Failed to parse JSON from response",
-                    "response": response.content
-                }]
-        else:
-            analysis = [{
-                "error": "Response is not valid JSON",
-                "response": response.content
-            }]
+        json_match = JSON_BLOCK_PATTERN.search(content)
+        if not json_match:
+            return None
+        try:
+            item = orjson.loads(json_match.group(1))
+        except json.JSONDecodeError:
+            return None
+    
+    # Some responses wrap the object in a list
+    if isinstance(item, list):
+        item = item[0] if item else None
+    return item if isinstance(item, dict) else None
+
+async def analyze_timeframe(symbol: str, timeframe: str, sentiment_data: Any, predictions_dir: str, timestamp: str) -> Dict[str, Any]:
+    """
+    Analyze one timeframe of a symbol and save the prediction
+    
+    Args:
+        symbol: The futures symbol (NQ, ES, YM)
+        timeframe: The timeframe to analyze (intraday, 5d, 30d)
+        sentiment_data: Sentiment data shared by all timeframes
+        predictions_dir: Directory the prediction file is written to
+        timestamp: ISO timestamp shared by all timeframes of the analysis
+        
+    Returns:
+        Dictionary containing the prediction, or an error entry
+    """
+    # Get the chart data for this timeframe only
+    chart_data = await asyncio.to_thread(get_chart_data, symbol, timeframe)
+    
+    prompt = PROMPT_TEMPLATE.format(
+        symbol=symbol,
+        timeframe=timeframe,
+        chart_data=chart_data,
+        sentiment_data=sentiment_data
+    )
+    
+    # Reuse a recent response if the prompt has not changed
+    key = cache_key(f"{__name__}.analyze_timeframe", prompt)
+    entry = load_cached(key)
+    cache_hit = entry is not None and time.time() - entry[0] < CACHE_TTL
+    if cache_hit:
+        content = entry[1]
+    else:
+        try:
+            response = await groq_client.chat.completions.create(
+                model=MODEL_ID,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=MAX_TOKENS
+            )
+        except Exception as e:
+            raise Exception(f"Error calling Groq API: {e}")
+        content = response.choices[0].message.content
+    
+    item = parse_response(content)
+    if item is None:
+        return {
+            "timeframe": timeframe,
+            "error": "Response is not valid JSON",
+            "response": content
+        }
+    
+    # Only cache responses that parsed, so a bad answer is retried next time
+    if not cache_hit:
+        save_cached(key, (time.time(), content))
+    
+    # Add metadata
+    item["timeframe"] = timeframe
+    item["symbol"] = symbol
+    item["agent"] = "groq"
+    item["timestamp"] = timestamp
+    
+    # Save to file as soon as this timeframe is done
+    write_json_atomic(os.path.join(predictions_dir, f"{timeframe}.json"), item)
+    
+    return item
+
+async def analyze_futures(symbol: str) -> Dict[str, Any]:
+    """
+    Analyze futures for a specific symbol and make predictions
+    
+    Each timeframe is sent as its own request and all of them run concurrently.
+    
+    Args:
+        symbol: The futures symbol (NQ, ES, YM)
+        
+    Returns:
+        Dictionary containing the analysis and predictions
+    """
+    # Create directories for predictions
+    predictions_dir = os.path.join("data", "predictions", "groq", symbol)
+    os.makedirs(predictions_dir, exist_ok=True)
+    
+    timestamp = datetime.now().isoformat()
+    
+    # Sentiment is shared by every timeframe, so fetch it once
+    sentiment_data = await asyncio.to_thread(get_sentiment, symbol)
+    
+    analysis = await asyncio.gather(
+        *(analyze_timeframe(symbol, timeframe, sentiment_data, predictions_dir, timestamp) for timeframe in TIMEFRAMES)
+    )
     
     return {
         "symbol": symbol,
-        "analysis": analysis,
-        "timestamp": datetime.now().isoformat()
+        "analysis": list(analysis),
+        "timestamp": timestamp
     }
 
+async def analyze_futures_batch(symbols: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analyze several futures symbols concurrently
+    
+    Args:
+        symbols: The futures symbols (NQ, ES, YM)
+        
+    Returns:
+        List of analysis results, in the same order as symbols
+    """
+    return await asyncio.gather(*(analyze_futures(symbol) for symbol in symbols))
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python groq_agent.py <symbol>")
+        print("Usage: python groq_agent.py <symbol> [<symbol> ...]")
         sys.exit(1)
     
-    symbol = sys.argv[1].upper()
-    if symbol not in ["NQ", "ES", "YM"]:
-        print(f"Invalid symbol: {symbol}. Choose from NQ, ES, YM.")
-        sys.exit(1)
+    symbols = [arg.upper() for arg in sys.argv[1:]]
+    for symbol in symbols:
+        if symbol not in ["NQ", "ES", "YM"]:
+            print(f"Invalid symbol: {symbol}. Choose from NQ, ES, YM.")
+            sys.exit(1)
     
-    result = analyze_futures(symbol)
-    print(json.dumps(result, indent=2))
+    results = asyncio.run(analyze_futures_batch(symbols))
+    print(json.dumps(results[0] if len(results) == 1 else results, indent=2))
@@ -1,12 +1,12 @@
 import streamlit as st
 from .database import Database
+from .plans import PLANS, plan_details
 import time
-from datetime import datetime, timedelta
 
 class Authentication:
-    def __init__(self):
-        """Initialize the authentication system"""
-        self.db = Database()
+    def __init__(self, database=None):
+        """Initialize the authentication system, sharing the given database if there is one"""
+        self.db = database if database is not None else Database()
         
         # Initialize session state variables
         if 'user' not in st.session_state:
@@ -23,15 +23,14 @@ class Authentication:
     
     def check_session(self):
         """Check if there's an existing valid session"""
-        if st.session_state.session_id:
-            user_id = self.db.validate_session(st.session_state.session_id)
-            if user_id:
-                user = self.db.get_user(user_id)
-                subscription = self.db.get_active_subscription(user_id)
-                
-                st.session_state.user = user
+        session_id = st.session_state.session_id
+        if session_id:
+            # One query returns the session's user and active subscription
+            bundle = self.db.get_session_bundle(session_id)
+            if bundle:
+                st.session_state.user = bundle["user"]
                 st.session_state.authenticated = True
-                st.session_state.subscription = subscription
+                st.session_state.subscription = bundle["subscription"]
                 return True
             else:
                 # Session is invalid or expired
@@ -56,13 +55,12 @@ class Authentication:
                 result = self.db.authenticate_user(username, password)
                 
                 if result["success"]:
-                    user = self.db.get_user(result["user_id"])
-                    subscription = self.db.get_active_subscription(result["user_id"])
+                    bundle = self.db.get_session_bundle(result["session_id"])
                     
-                    st.session_state.user = user
+                    st.session_state.user = bundle["user"]
                     st.session_state.authenticated = True
                     st.session_state.session_id = result["session_id"]
-                    st.session_state.subscription = subscription
+                    st.session_state.subscription = bundle["subscription"]
                     
                     st.success("Login successful!")
                     time.sleep(1)
@@ -172,11 +170,11 @@ class Authentication:
         stats = self.db.get_usage_stats(user_id)
         
         if stats["has_subscription"]:
-            plan_name = {
-                "free_trial": "Free Trial",
-                "basic": "Basic Plan ($100)",
-                "premium": "Premium Plan ($500)"
-            }.get(stats["plan_type"], stats["plan_type"])
+            plan = PLANS.get(stats["plan_type"])
+            if plan:
+                plan_name = f"{plan['name']} (${plan['amount'] // 100})"
+            else:
+                plan_name = {"free_trial": "Free Trial"}.get(stats["plan_type"], stats["plan_type"])
             
             st.sidebar.markdown(f"### Subscription: {plan_name}")
             
@@ -187,8 +185,7 @@ class Authentication:
             st.sidebar.markdown(f"**Runs Used:** {stats['runs_used']} / {stats['runs_allowed']}")
             
             if stats["end_date"]:
-                end_date = datetime.fromisoformat(stats["end_date"])
-                days_left = (end_date - datetime.now()).days
+                days_left = int(stats["end_date"] - time.time()) // (24 * 60 * 60)
                 st.sidebar.markdown(f"**Days Remaining:** {max(0, days_left)}")
         else:
             st.sidebar.warning("No active subscription")
@@ -217,30 +214,13 @@ class Authentication:
         """Display the subscription page with available plans"""
         st.subheader("Subscription Plans")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("""
-            ### Basic Plan
-            - **Price:** $100
-            - **Runs:** 10 runs
-            - **Features:** Full access to all analysis tools
-            """)
-            
-            if st.button("Purchase Basic Plan"):
-                self.handle_payment("basic")
-        
-        with col2:
-            st.markdown("""
-            ### Premium Plan
-            - **Price:** $500
-            - **Runs:** 100 runs
-            - **Duration:** 30 days
-            - **Features:** Full access to all analysis tools
-            """)
-            
-            if st.button("Purchase Premium Plan"):
-                self.handle_payment("premium")
+        # One column per plan, rendered from PLANS
+        for column, (plan_type, plan) in zip(st.columns(len(PLANS)), PLANS.items()):
+            with column:
+                st.markdown(plan_details(plan))
+                
+                if st.button(f"Purchase {plan['name']}"):
+                    self.handle_payment(plan_type)
     
     def handle_payment(self, plan_type):
         """Handle payment for subscription"""
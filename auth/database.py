@@ -2,9 +2,31 @@ import sqlite3
 import os
 import json
 import hashlib
+import hmac
 import uuid
-from datetime import datetime, timedelta
+from ulid import ULID
 import time
+import threading
+import weakref
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from .plans import PLANS
+
+# Timestamps are stored as Unix epoch seconds
+DAY_SECONDS = 24 * 60 * 60
+
+# Expired sessions and subscriptions are cleaned up in the background every SWEEP_INTERVAL seconds,
+# by one sweeper thread per database file (even if several Database objects open the same file)
+SWEEP_INTERVAL = 60
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+class _Lease:
+    """A pooled connection held in a thread's local storage, handed back to the pool when the thread finishes"""
+    __slots__ = ("conn", "__weakref__")
+    
+    def __init__(self, conn):
+        self.conn = conn
 
 class Database:
     def __init__(self, db_path="auth/users.db"):
@@ -13,124 +35,240 @@ class Database:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.password_hasher = PasswordHasher()
+        
+        # One connection per thread, so concurrent sessions don't queue on a shared connection.
+        # Streamlit runs every rerun on a new thread, so connections of finished threads are pooled and reused.
+        self._local = threading.local()
+        self._connections = set()
+        self._idle = []
+        self._connections_lock = threading.RLock()
+        
         self.create_tables()
+        self.start_sweeper()
     
-    def create_tables(self):
-        """Create the necessary tables if they don't exist"""
-        cursor = self.conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
+    @property
+    def conn(self):
+        """Get the calling thread's connection, taking an idle one or opening a new one on first use"""
+        lease = getattr(self._local, "lease", None)
+        if lease is None:
+            with self._connections_lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self.connect()
+                with self._connections_lock:
+                    self._connections.add(conn)
+            lease = _Lease(conn)
+            # The lease is freed with the thread's local storage when the thread finishes
+            weakref.finalize(lease, self._release, conn)
+            self._local.lease = lease
+        return lease.conn
+    
+    def _release(self, conn):
+        """Return a finished thread's connection to the idle pool, unless the database was closed"""
+        with self._connections_lock:
+            if conn not in self._connections:
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append(conn)
+    
+    def connect(self):
+        """Open and tune a new connection: WAL so readers don't block on writers, fewer fsyncs, larger caches"""
+        # check_same_thread is off because pooled connections move between threads (a finished thread's
+        # connection is handed to the next one) and close() closes them all. The pool leases each
+        # connection to one thread at a time, so its use is still serialized.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
+    # Table definitions, in creation order (parents before children)
+    TABLES = {
+        "users": """
             id TEXT PRIMARY KEY,
             username TEXT UNIQUE NOT NULL,
             email TEXT UNIQUE NOT NULL,
             password_hash TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            last_login TEXT
-        )
-        ''')
-        
-        # Subscriptions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS subscriptions (
+            created_at INTEGER NOT NULL,
+            last_login INTEGER
+        """,
+        "subscriptions": """
             id TEXT PRIMARY KEY,
             user_id TEXT NOT NULL,
             plan_type TEXT NOT NULL,
-            start_date TEXT NOT NULL,
-            end_date TEXT,
+            start_date INTEGER NOT NULL,
+            end_date INTEGER,
             runs_allowed INTEGER NOT NULL,
             runs_used INTEGER DEFAULT 0,
             payment_id TEXT,
             active BOOLEAN DEFAULT 1,
             FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        ''')
-        
-        # Sessions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
+        """,
+        "sessions": """
             id TEXT PRIMARY KEY,
             user_id TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
             FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        ''')
-        
-        # Usage logs table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS usage_logs (
+        """,
+        "usage_logs": """
             id TEXT PRIMARY KEY,
             user_id TEXT NOT NULL,
             subscription_id TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
             symbol TEXT NOT NULL,
             FOREIGN KEY (user_id) REFERENCES users (id),
             FOREIGN KEY (subscription_id) REFERENCES subscriptions (id)
-        )
-        ''')
+        """
+    }
+    
+    # Subscription columns returned to callers
+    SUBSCRIPTION_COLUMNS = "id, plan_type, start_date, end_date, runs_allowed, runs_used"
+    
+    # Timestamp columns, stored as INTEGER Unix epoch seconds
+    TIMESTAMP_COLUMNS = {
+        "users": ("created_at", "last_login"),
+        "subscriptions": ("start_date", "end_date"),
+        "sessions": ("created_at", "expires_at"),
+        "usage_logs": ("timestamp",)
+    }
+    
+    def create_tables(self):
+        """Create the necessary tables if they don't exist"""
+        cursor = self.conn.cursor()
+        
+        for table, columns in self.TABLES.items():
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        
+        # Convert databases created with ISO-8601 TEXT timestamps
+        self.migrate_timestamps()
+        
+        # Indexes for the session, subscription and usage lookups
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts ON usage_logs (timestamp DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_symbol ON usage_logs (symbol)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_user_ts ON usage_logs (user_id, timestamp DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_sub ON usage_logs (subscription_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sub_user_active_end ON subscriptions (user_id, active, end_date DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+        
+        # Drop indexes superseded by the wider ones above
+        cursor.execute("DROP INDEX IF EXISTS idx_logs_user")
+        cursor.execute("DROP INDEX IF EXISTS idx_sub_user_active")
         
         self.conn.commit()
     
+    def migrate_timestamps(self):
+        """Rebuild tables whose timestamp columns are still ISO-8601 TEXT with INTEGER epoch columns"""
+        # Column types can't be altered in place, so each table is recreated and copied
+        legacy_tables = [
+            table for table, columns in self.TIMESTAMP_COLUMNS.items()
+            if any(row["name"] == columns[0] and row["type"] == "TEXT" for row in self.conn.execute(f"PRAGMA table_info({table})"))
+        ]
+        if not legacy_tables:
+            return
+        
+        # Foreign keys must be off while parent tables are dropped and renamed
+        self.conn.commit()
+        self.conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            self.conn.execute("BEGIN")
+            for table in legacy_tables:
+                names = [row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+                # The stored values are local time, so the 'utc' modifier converts them to UTC before taking the epoch
+                select = ", ".join(
+                    f"CAST(strftime('%s', {name}, 'utc') AS INTEGER)" if name in self.TIMESTAMP_COLUMNS[table] else name
+                    for name in names
+                )
+                self.conn.execute(f"CREATE TABLE {table}_new ({self.TABLES[table]})")
+                self.conn.execute(f"INSERT INTO {table}_new ({', '.join(names)}) SELECT {select} FROM {table}")
+                self.conn.execute(f"DROP TABLE {table}")
+                self.conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.execute("PRAGMA foreign_keys=ON")
+    
     def hash_password(self, password):
-        """Hash a password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash a password using Argon2id"""
+        return self.password_hasher.hash(password)
+    
+    def verify_password(self, password_hash, password):
+        """Check a password against a stored Argon2 or legacy SHA-256 hash"""
+        if not password_hash.startswith("$argon2"):
+            # Accounts created before the switch to Argon2 store an unsalted SHA-256 hex digest
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+        
+        try:
+            return self.password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
     
     def create_user(self, username, email, password):
         """Create a new user"""
         cursor = self.conn.cursor()
         
         # Check if user already exists
-        cursor.execute("SELECT * FROM users WHERE username = ? OR email = ?", (username, email))
+        cursor.execute("SELECT 1 FROM users WHERE username = ? OR email = ? LIMIT 1", (username, email))
         if cursor.fetchone():
             return {"success": False, "message": "Username or email already exists"}
         
-        # Create user
-        user_id = str(uuid.uuid4())
+        # Create user (ULIDs are time-ordered, so new rows append to the end of the primary key index)
+        user_id = str(ULID())
         password_hash = self.hash_password(password)
-        created_at = datetime.now().isoformat()
-        
-        cursor.execute(
-            "INSERT INTO users (id, username, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?)",
-            (user_id, username, email, password_hash, created_at)
-        )
-        
-        # Create free trial subscription
-        self.create_free_trial(user_id)
+        created_at = int(time.time())
+        
+        # Insert the user and their free trial in one transaction (a single commit)
+        with self.conn:
+            cursor.execute(
+                "INSERT INTO users (id, username, email, password_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user_id, username, email, password_hash, created_at)
+            )
+            
+            # Create free trial subscription
+            self._insert_free_trial(cursor, user_id, created_at)
         
-        self.conn.commit()
         return {"success": True, "user_id": user_id}
     
     def create_free_trial(self, user_id):
         """Create a free trial subscription for a new user"""
-        subscription_id = str(uuid.uuid4())
-        start_date = datetime.now().isoformat()
-        end_date = (datetime.now() + timedelta(days=3)).isoformat()
+        with self.conn:
+            return self._insert_free_trial(self.conn.cursor(), user_id, int(time.time()))
+    
+    def _insert_free_trial(self, cursor, user_id, start_date):
+        """Insert a free trial subscription starting at start_date without committing"""
+        subscription_id = str(ULID())
+        end_date = start_date + 3 * DAY_SECONDS
         
-        cursor = self.conn.cursor()
         cursor.execute(
             "INSERT INTO subscriptions (id, user_id, plan_type, start_date, end_date, runs_allowed, runs_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
             (subscription_id, user_id, "free_trial", start_date, end_date, 3, 0)
         )
-        self.conn.commit()
         return subscription_id
     
     def authenticate_user(self, username, password):
         """Authenticate a user by username and password"""
         cursor = self.conn.cursor()
-        password_hash = self.hash_password(password)
         
-        cursor.execute("SELECT * FROM users WHERE username = ? AND password_hash = ?", (username, password_hash))
+        cursor.execute("SELECT id, password_hash FROM users WHERE username = ?", (username,))
         user = cursor.fetchone()
         
-        if not user:
+        if not user or not self.verify_password(user["password_hash"], password):
             return {"success": False, "message": "Invalid username or password"}
         
+        # Upgrade legacy SHA-256 hashes (and outdated Argon2 parameters) now that we know the password
+        if not user["password_hash"].startswith("$argon2") or self.password_hasher.check_needs_rehash(user["password_hash"]):
+            cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (self.hash_password(password), user["id"]))
+        
         # Update last login
-        cursor.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.now().isoformat(), user["id"]))
+        cursor.execute("UPDATE users SET last_login = ? WHERE id = ?", (int(time.time()), user["id"]))
         self.conn.commit()
         
         # Create session
@@ -140,9 +278,10 @@ class Database:
     
     def create_session(self, user_id):
         """Create a new session for a user"""
+        # Session IDs are bearer tokens, so keep them fully random rather than time-ordered
         session_id = str(uuid.uuid4())
-        created_at = datetime.now().isoformat()
-        expires_at = (datetime.now() + timedelta(days=1)).isoformat()  # Sessions expire after 1 day
+        created_at = int(time.time())
+        expires_at = created_at + DAY_SECONDS  # Sessions expire after 1 day
         
         cursor = self.conn.cursor()
         cursor.execute(
@@ -159,22 +298,54 @@ class Database:
             return None
         
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM sessions WHERE id = ?", (session_id,))
+        cursor.execute("SELECT user_id, expires_at FROM sessions WHERE id = ?", (session_id,))
         session = cursor.fetchone()
         
         if not session:
             return None
         
-        # Check if session is expired
-        expires_at = datetime.fromisoformat(session["expires_at"])
-        if datetime.now() > expires_at:
-            # Delete expired session
-            cursor.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
-            self.conn.commit()
+        # Check if session is expired (the background sweeper deletes it later)
+        if time.time() > session["expires_at"]:
             return None
         
         return session["user_id"]
     
+    def get_session_bundle(self, session_id):
+        """Get the user and usable active subscription for a valid session in a single query"""
+        if not session_id:
+            return None
+        
+        cursor = self.conn.cursor()
+        now = int(time.time())
+        cursor.execute(
+            """
+            SELECT u.id, u.username, u.email, u.created_at, u.last_login,
+                   s.id AS sub_id, s.plan_type, s.start_date, s.end_date, s.runs_allowed, s.runs_used
+            FROM sessions se
+            JOIN users u ON u.id = se.user_id
+            LEFT JOIN subscriptions s ON s.user_id = u.id AND s.active = 1
+                AND (s.end_date IS NULL OR s.end_date >= ?) AND s.runs_used < s.runs_allowed
+            WHERE se.id = ? AND se.expires_at >= ?
+            ORDER BY s.end_date DESC
+            LIMIT 1
+            """,
+            (now, session_id, now)
+        )
+        row = cursor.fetchone()
+        
+        if not row:
+            return None
+        
+        user = {key: row[key] for key in ("id", "username", "email", "created_at", "last_login")}
+        subscription = None
+        if row["sub_id"]:
+            subscription = {
+                "id": row["sub_id"],
+                **{key: row[key] for key in ("plan_type", "start_date", "end_date", "runs_allowed", "runs_used")}
+            }
+        
+        return {"user": user, "subscription": subscription}
+    
     def get_user(self, user_id):
         """Get user details by ID"""
         cursor = self.conn.cursor()
@@ -189,8 +360,16 @@ class Database:
     def get_active_subscription(self, user_id):
         """Get the active subscription for a user"""
         cursor = self.conn.cursor()
+        
+        # Deactivate subscriptions that have expired or used all their runs
+        cursor.execute(
+            "UPDATE subscriptions SET active = 0 WHERE user_id = ? AND active = 1 AND ((end_date IS NOT NULL AND end_date < ?) OR runs_used >= runs_allowed)",
+            (user_id, int(time.time()))
+        )
+        self.conn.commit()
+        
         cursor.execute(
-            "SELECT * FROM subscriptions WHERE user_id = ? AND active = 1 ORDER BY end_date DESC LIMIT 1",
+            f"SELECT {self.SUBSCRIPTION_COLUMNS} FROM subscriptions WHERE user_id = ? AND active = 1 ORDER BY end_date DESC LIMIT 1",
             (user_id,)
         )
         subscription = cursor.fetchone()
@@ -198,40 +377,19 @@ class Database:
         if not subscription:
             return None
         
-        subscription_dict = dict(subscription)
-        
-        # Check if subscription is expired
-        if subscription_dict["end_date"]:
-            end_date = datetime.fromisoformat(subscription_dict["end_date"])
-            if datetime.now() > end_date:
-                # Deactivate subscription
-                cursor.execute("UPDATE subscriptions SET active = 0 WHERE id = ?", (subscription_dict["id"],))
-                self.conn.commit()
-                return None
-        
-        # Check if all runs are used
-        if subscription_dict["runs_used"] >= subscription_dict["runs_allowed"]:
-            # Deactivate subscription if all runs are used
-            cursor.execute("UPDATE subscriptions SET active = 0 WHERE id = ?", (subscription_dict["id"],))
-            self.conn.commit()
-            return None
-        
-        return subscription_dict
+        return dict(subscription)
     
     def create_subscription(self, user_id, plan_type, payment_id=None):
         """Create a new subscription for a user"""
-        subscription_id = str(uuid.uuid4())
-        start_date = datetime.now().isoformat()
-        
-        # Set subscription details based on plan type
-        if plan_type == "basic":
-            runs_allowed = 10
-            end_date = None  # No expiration date for run-based plans
-        elif plan_type == "premium":
-            runs_allowed = 100
-            end_date = (datetime.now() + timedelta(days=30)).isoformat()  # 30-day expiration
-        else:
+        subscription_id = str(ULID())
+        start_date = int(time.time())
+        
+        # Set subscription details based on plan type (run-based plans have no expiration date)
+        plan = PLANS.get(plan_type)
+        if plan is None:
             return {"success": False, "message": "Invalid plan type"}
+        runs_allowed = plan["runs"]
+        end_date = start_date + plan["days"] * DAY_SECONDS if plan["days"] else None
         
         cursor = self.conn.cursor()
         
@@ -250,27 +408,35 @@ class Database:
     def log_usage(self, user_id, subscription_id, symbol):
         """Log usage of the analysis tool"""
         cursor = self.conn.cursor()
-        
-        # Increment runs_used in subscription
-        cursor.execute("UPDATE subscriptions SET runs_used = runs_used + 1 WHERE id = ?", (subscription_id,))
-        
-        # Log usage
-        log_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
-        
-        cursor.execute(
-            "INSERT INTO usage_logs (id, user_id, subscription_id, timestamp, symbol) VALUES (?, ?, ?, ?, ?)",
-            (log_id, user_id, subscription_id, timestamp, symbol)
-        )
-        
-        self.conn.commit()
-        
-        # Get updated subscription
-        cursor.execute("SELECT * FROM subscriptions WHERE id = ?", (subscription_id,))
-        subscription = cursor.fetchone()
+        log_id = str(ULID())
+        timestamp = int(time.time())
+        
+        # Update the run count, log the run and read back the subscription in one transaction
+        with self.conn:
+            # Increment runs_used in subscription
+            cursor.execute("UPDATE subscriptions SET runs_used = runs_used + 1 WHERE id = ?", (subscription_id,))
+            
+            # Log usage
+            cursor.execute(
+                "INSERT INTO usage_logs (id, user_id, subscription_id, timestamp, symbol) VALUES (?, ?, ?, ?, ?)",
+                (log_id, user_id, subscription_id, timestamp, symbol)
+            )
+            
+            # Get updated subscription
+            cursor.execute(f"SELECT {self.SUBSCRIPTION_COLUMNS} FROM subscriptions WHERE id = ?", (subscription_id,))
+            subscription = cursor.fetchone()
         
         return dict(subscription)
     
+    def delete_user(self, user_id):
+        """Delete a user along with their sessions, usage logs and subscriptions"""
+        # Run all deletes in a single transaction so a failure leaves nothing half-deleted
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            self.conn.execute("DELETE FROM usage_logs WHERE user_id = ?", (user_id,))
+            self.conn.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
+            self.conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+    
     def get_usage_stats(self, user_id):
         """Get usage statistics for a user"""
         cursor = self.conn.cursor()
@@ -285,7 +451,7 @@ class Database:
         
         # Get recent usage logs
         cursor.execute(
-            "SELECT * FROM usage_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 10",
+            "SELECT id, subscription_id, timestamp, symbol FROM usage_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 10",
             (user_id,)
         )
         logs = cursor.fetchall()
@@ -301,6 +467,42 @@ class Database:
             "recent_usage": [dict(log) for log in logs]
         }
     
+    def sweep_expired(self):
+        """Delete expired sessions and deactivate expired subscriptions"""
+        now = int(time.time())
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+            self.conn.execute(
+                "UPDATE subscriptions SET active = 0 WHERE active = 1 AND end_date IS NOT NULL AND end_date < ?",
+                (now,)
+            )
+    
+    def start_sweeper(self):
+        """Start the background sweeper for this database file if it isn't running yet"""
+        path = os.path.abspath(self.db_path)
+        with _sweepers_lock:
+            if path in _sweepers:
+                return
+            thread = threading.Thread(target=self._sweep_loop, name="db-sweeper", daemon=True)
+            _sweepers[path] = thread
+        thread.start()
+    
+    def _sweep_loop(self):
+        """Run sweep_expired every SWEEP_INTERVAL seconds"""
+        while True:
+            time.sleep(SWEEP_INTERVAL)
+            try:
+                self.sweep_expired()
+            except sqlite3.Error:
+                # Try again on the next pass (e.g. the database was busy)
+                pass
+    
     def close(self):
-        """Close the database connection"""
-        self.conn.close()
+        """Close the database connections of all threads"""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -3,53 +3,73 @@ import time
 import uuid
 from datetime import datetime, timedelta
 import os
-import stripe
 from dotenv import load_dotenv
+from .plans import PLANS, plan_description, plan_details
 
-# Load environment variables
+# Load environment variables once per process, not on every rerun that builds a PaymentProcessor
 load_dotenv()
-
-# Initialize Stripe with your secret key
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 publishable_key = os.getenv("STRIPE_PUBLISHABLE_KEY")
 
+# Separators allowed in card numbers and the Luhn value of each doubled digit
+CARD_SEPARATORS = str.maketrans("", "", " -")
+LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# Stripe test cards shown above the payment form
+TEST_CARDS_HTML = """
+<div style="padding: 10px; border: 1px solid #ccc; border-radius: 5px; margin-bottom: 20px;">
+    <p>Using Stripe Test Mode - Use these test cards:</p>
+    <ul>
+        <li>Success: 4242 4242 4242 4242</li>
+        <li>Requires Authentication: 4000 0025 0000 3155</li>
+        <li>Declined: 4000 0000 0000 9995</li>
+    </ul>
+</div>
+"""
+
+# Rerun only the payment form on submit (st.fragment needs Streamlit 1.37, older versions rerun the page)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+def is_valid_card_number(card_number):
+    """Check the length and Luhn checksum of a card number"""
+    digits = card_number.translate(CARD_SEPARATORS)
+    if not (digits.isascii() and digits.isdigit()) or not 15 <= len(digits) <= 19:
+        return False
+    
+    # Double every second digit from the right
+    total = sum(map(int, digits[-1::-2])) + sum(LUHN_DOUBLED[int(d)] for d in digits[-2::-2])
+    return total % 10 == 0
+
 class PaymentProcessor:
     def __init__(self, database):
         """Initialize the payment processor"""
         self.db = database
+        self.publishable_key = publishable_key
     
     def display_payment_form(self, plan_type):
         """Display a payment form for the selected plan"""
         st.subheader("Payment Information")
         
         # Get plan details
-        if plan_type == "basic":
-            amount = 10000  # $100.00 in cents
-            description = "Basic Plan - 10 runs"
-        elif plan_type == "premium":
-            amount = 50000  # $500.00 in cents
-            description = "Premium Plan - 100 runs (30 days)"
-        else:
+        plan = PLANS.get(plan_type)
+        if plan is None:
             st.error("Invalid plan type")
             return False
         
+        return self.render_payment_form(plan_type, plan["amount"], plan_description(plan))
+    
+    @fragment
+    def render_payment_form(self, plan_type, amount, description):
+        """Render the payment form and process it when submitted"""
+        amount_label = f"${amount/100:.2f}"
+        
         # Display payment form
         with st.form(f"payment_form_{plan_type}"):
             st.markdown(f"### {description}")
-            st.markdown(f"**Amount:** ${amount/100:.2f}")
+            st.markdown(f"**Amount:** {amount_label}")
             
             # Credit card information
             st.markdown("### Card Information")
-            st.markdown(f"""
-            <div style="padding: 10px; border: 1px solid #ccc; border-radius: 5px; margin-bottom: 20px;">
-                <p>Using Stripe Test Mode - Use these test cards:</p>
-                <ul>
-                    <li>Success: 4242 4242 4242 4242</li>
-                    <li>Requires Authentication: 4000 0025 0000 3155</li>
-                    <li>Declined: 4000 0000 0000 9995</li>
-                </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(TEST_CARDS_HTML, unsafe_allow_html=True)
             
             # Since Streamlit doesn't support direct JavaScript integration,
             # we'll use a workaround for demonstration purposes
@@ -67,7 +87,7 @@ class PaymentProcessor:
             terms = st.checkbox("I agree to the terms and conditions", value=True)
             
             # Submit button
-            submit = st.form_submit_button(f"Pay ${amount/100:.2f}")
+            submit = st.form_submit_button(f"Pay {amount_label}")
             
             if submit:
                 if not terms:
@@ -79,11 +99,14 @@ class PaymentProcessor:
                     return False
                 
                 # Basic validation
-                if not card_number.replace(' ', '').isdigit() or len(card_number.replace(' ', '')) < 15:
+                if not is_valid_card_number(card_number):
                     st.error("Invalid card number")
                     return False
                 
-                return self.process_payment(plan_type, amount, card_number, exp_date, cvc, cardholder_name)
+                if self.process_payment(plan_type, amount, card_number, exp_date, cvc, cardholder_name):
+                    # A fragment rerun only redraws the form, so rerun the app to show the new plan
+                    st.rerun()
+                return False
         
         return False
     
@@ -123,9 +146,6 @@ class PaymentProcessor:
                     # For demo purposes, assume success for other card numbers
                     payment_status = "succeeded"
                 
-                # Simulate payment processing delay
-                time.sleep(2)
-                
                 if payment_status == "succeeded":
                     # Generate a simulated Stripe payment ID
                     payment_id = f"pi_{uuid.uuid4().hex[:8]}_{int(time.time())}"
@@ -140,7 +160,7 @@ class PaymentProcessor:
                             subscription = self.db.get_active_subscription(user_id)
                             st.session_state.subscription = subscription
                             
-                            st.success(f"Payment successful! Your {plan_type} plan is now active.")
+                            st.toast(f"Payment successful! Your {plan_type} plan is now active.", icon="✅")
                             return True
                         else:
                             st.error(result["message"])
@@ -159,29 +179,12 @@ class PaymentProcessor:
         """Display available subscription plans"""
         st.subheader("Subscription Plans")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("""
-            ### Basic Plan
-            - **Price:** $100
-            - **Runs:** 10 runs
-            - **Features:** Full access to all analysis tools
-            """)
-            
-            if st.button("Select Basic Plan"):
-                return self.display_payment_form("basic")
-        
-        with col2:
-            st.markdown("""
-            ### Premium Plan
-            - **Price:** $500
-            - **Runs:** 100 runs
-            - **Duration:** 30 days
-            - **Features:** Full access to all analysis tools
-            """)
-            
-            if st.button("Select Premium Plan"):
-                return self.display_payment_form("premium")
+        # One column per plan, rendered from PLANS
+        for column, (plan_type, plan) in zip(st.columns(len(PLANS)), PLANS.items()):
+            with column:
+                st.markdown(plan_details(plan))
+                
+                if st.button(f"Select {plan['name']}"):
+                    return self.display_payment_form(plan_type)
         
         return False
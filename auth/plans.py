@@ -0,0 +1,25 @@
+# Subscription plans: price in cents, runs included and duration (None if unlimited).
+# The single source for the payment form, the plan pages and the subscriptions created in the database.
+PLANS = {
+    "basic": {"name": "Basic Plan", "amount": 10000, "runs": 10, "days": None},
+    "premium": {"name": "Premium Plan", "amount": 50000, "runs": 100, "days": 30},
+}
+
+def plan_description(plan):
+    """Short description of a plan, e.g. 'Premium Plan - 100 runs (30 days)'"""
+    description = f"{plan['name']} - {plan['runs']} runs"
+    if plan["days"]:
+        description += f" ({plan['days']} days)"
+    return description
+
+def plan_details(plan):
+    """Markdown list describing a plan on the subscription pages"""
+    details = [
+        f"### {plan['name']}",
+        f"- **Price:** ${plan['amount'] // 100}",
+        f"- **Runs:** {plan['runs']} runs",
+    ]
+    if plan["days"]:
+        details.append(f"- **Duration:** {plan['days']} days")
+    details.append("- **Features:** Full access to all analysis tools")
+    return "\n".join(details)
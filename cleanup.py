@@ -1,8 +1,19 @@
 import os
-import shutil
 import sys
 
-def cleanup():
+def clear_directory(path):
+    """
+    Delete everything inside a directory, keeping the directory itself
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                clear_directory(entry.path)
+                os.rmdir(entry.path)
+            else:
+                os.unlink(entry.path)
+
+def cleanup(confirm=True):
     """
     Clean up the data directory
     """
@@ -12,25 +23,22 @@ def cleanup():
         print(f"Data directory '{data_dir}' does not exist. Nothing to clean up.")
         return
     
-    print(f"This will delete all data in the '{data_dir}' directory.")
-    print("Are you sure you want to continue? (y/n)")
-    
-    choice = input().lower()
-    if choice != 'y':
-        print("Cleanup cancelled.")
-        return
+    if confirm:
+        print(f"This will delete all data in the '{data_dir}' directory.")
+        print("Are you sure you want to continue? (y/n)")
+        
+        choice = input().lower()
+        if choice != 'y':
+            print("Cleanup cancelled.")
+            return
     
     try:
-        # Remove the data directory and all its contents
-        shutil.rmtree(data_dir)
-        print(f"Data directory '{data_dir}' has been deleted.")
+        # Remove the contents of the data directory, leaving it empty in place
+        clear_directory(data_dir)
+        print(f"Data directory '{data_dir}' has been emptied.")
     except Exception as e:
-        print(f"Error deleting data directory: {e}")
-        return
-    
-    # Recreate the data directory
-    os.makedirs(data_dir, exist_ok=True)
-    print(f"Empty data directory '{data_dir}' has been created.")
+        print(f"Error deleting data directory contents: {e}")
 
 if __name__ == "__main__":
-    cleanup()
+    # Pass --yes to skip the confirmation prompt
+    cleanup(confirm="--yes" not in sys.argv[1:])
@@ -1,98 +1,108 @@
 import os
 import sys
-import json
-import pandas as pd
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any
 from setup_env import setup_env
 
-# Import our agents
-from agents.deepseek import analyze_futures as deepseek_analyze
-from agents.gemini import analyze_futures as gemini_analyze
-from agents.groq import analyze_futures as groq_analyze
+# Progress messages from run_analysis, tagged with the symbol so concurrent runs stay readable
+logger = logging.getLogger("analysis")
 
-# Import our tools
-from tools.chart_scraper.chart_scraper import ChartScraper
-from tools.mean_analysis.mean_analyzer import MeanAnalyzer
-from tools.mean_analysis.mean_visualizer import MeanVisualizer
-from tools.volume_profile.agno_tool import get_volume_profile
-from tools.sentiment_analyzer.agno_tool import get_alpha_vantage_sentiment
+def configure_logging():
+    """
+    Send analysis progress messages to stderr with a timestamp
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
 
-def run_analysis(symbol: str) -> Dict[str, Any]:
+def run_analysis(symbol: str, *, chart_scraper=None, mean_analyzer=None, mean_visualizer=None) -> Dict[str, Any]:
     """
     Run analysis for a specific symbol using all agents
     
     Args:
         symbol: The futures symbol (NQ, ES, YM)
+        chart_scraper: ChartScraper to reuse across symbols (created if not provided)
+        mean_analyzer: MeanAnalyzer to reuse across symbols (created if not provided)
+        mean_visualizer: MeanVisualizer to reuse across symbols (created if not provided)
         
     Returns:
         Dictionary containing the combined analysis
     """
-    print(f"Running analysis for {symbol}...")
+    # Import the agents and tools here so a bad command line fails fast
+    from agents.deepseek import analyze_futures as deepseek_analyze
+    from agents.gemini import analyze_futures as gemini_analyze
+    from agents.groq import analyze_futures as groq_analyze
+    from tools.chart_scraper.chart_scraper import ChartScraper
+    from tools.mean_analysis.mean_analyzer import MeanAnalyzer
+    from tools.mean_analysis.mean_visualizer import MeanVisualizer
+    from tools.volume_profile.agno_tool import get_volume_profile
+    from tools.sentiment_analyzer.agno_tool import get_alpha_vantage_sentiment
+    
+    logger.info("[%s] Running analysis", symbol)
     
     # Create data directory if it doesn't exist
     os.makedirs("data", exist_ok=True)
     
     # Initialize chart scraper
-    chart_scraper = ChartScraper(data_dir="data")
-    
-    # Scrape chart data for all timeframes
-    print(f"Scraping chart data for {symbol}...")
-    chart_data = {}
-    for timeframe in chart_scraper.TIMEFRAMES:
-        print(f"  - {timeframe}")
-        chart_data[timeframe] = chart_scraper.get_ticker_data(symbol, timeframe)
-        chart_scraper.plot_chart(symbol, timeframe)
-    
-    # Get volume profile analysis from Alpha Vantage
-    print(f"Analyzing volume profile for {symbol} using Alpha Vantage API...")
-    volume_profile_analysis = get_volume_profile(symbol, interval="5min")
-    print(f"Alpha Vantage volume profile analysis complete.")
-    
-    # Get news sentiment analysis from Alpha Vantage
-    print(f"Analyzing news sentiment for {symbol} using Alpha Vantage API...")
-    news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
-    print(f"Alpha Vantage news sentiment analysis complete.")
-    
-    # Run analysis with each agent
-    print(f"Running analysis with DeepSeek...")
-    deepseek_result = deepseek_analyze(symbol)
-    
-    print(f"Running analysis with Gemini...")
-    gemini_result = gemini_analyze(symbol)
-    
-    # Run analysis with Groq
-    print(f"Running analysis with Groq...")
-    groq_result = groq_analyze(symbol)
+    if chart_scraper is None:
+        chart_scraper = ChartScraper(data_dir="data")
+    
+    # Scrape and plot chart data for all timeframes concurrently, each chart is its own Figure
+    logger.info("[%s] Scraping and plotting chart data", symbol)
+    def fetch_and_plot(timeframe):
+        data = chart_scraper.get_ticker_data(symbol, timeframe)
+        logger.info("[%s] Plotting %s chart", symbol, timeframe)
+        chart_scraper.plot_chart(symbol, timeframe, data=data)
+        return data
+    
+    with ThreadPoolExecutor(max_workers=len(chart_scraper.TIMEFRAMES)) as executor:
+        chart_futures = {timeframe: executor.submit(fetch_and_plot, timeframe) for timeframe in chart_scraper.TIMEFRAMES}
+        chart_data = {timeframe: future.result() for timeframe, future in chart_futures.items()}
+    
+    # Run the Alpha Vantage analyses and each agent concurrently, they are independent API calls
+    logger.info("[%s] Running Alpha Vantage analyses and agents (DeepSeek, Gemini, Groq)", symbol)
+    tasks = {
+        "volume_profile_analysis": lambda: get_volume_profile(symbol, interval="5min"),
+        "news_sentiment_analysis": lambda: get_alpha_vantage_sentiment(symbol),
+        "deepseek_result": lambda: deepseek_analyze(symbol),
+        "gemini_result": lambda: gemini_analyze(symbol),
+        "groq_result": lambda: groq_analyze(symbol),
+    }
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    logger.info("[%s] Analyses complete", symbol)
     
     # Combine predictions using mean analyzer and visualize
-    print(f"Combining predictions...")
-    mean_analyzer = MeanAnalyzer(data_dir="data")
-    mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
+    logger.info("[%s] Combining predictions", symbol)
+    if mean_analyzer is None:
+        mean_analyzer = MeanAnalyzer(data_dir="data")
+    if mean_visualizer is None:
+        mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
     
     mean_predictions = {}
     for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES:
-        print(f"  - {timeframe}")
+        logger.info("[%s] Combining %s predictions", symbol, timeframe)
         try:
             # First combine predictions
             mean_predictions[timeframe] = mean_analyzer.combine_predictions(symbol, timeframe)
             # Then visualize them
             mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
         except Exception as e:
-            print(f"    Error: {e}")
+            logger.error("[%s] Error combining %s predictions: %s", symbol, timeframe, e)
     
     # Create interactive chart
-    print(f"Creating interactive chart...")
-    interactive_chart = mean_visualizer.create_interactive_chart(symbol)
+    logger.info("[%s] Creating interactive chart", symbol)
+    interactive_chart = mean_visualizer.create_interactive_chart(
+        symbol,
+        volume_profile_analysis=results["volume_profile_analysis"],
+        news_sentiment_analysis=results["news_sentiment_analysis"],
+    )
     
     return {
         "symbol": symbol,
-        "chart_data": {timeframe: chart_data[timeframe].to_dict() for timeframe in chart_data},
-        "volume_profile_analysis": volume_profile_analysis,
-        "news_sentiment_analysis": news_sentiment_analysis,
-        "deepseek_result": deepseek_result,
-        "gemini_result": gemini_result,
-        "groq_result": groq_result,
+        "chart_data_paths": {timeframe: chart_scraper.get_data_path(symbol, timeframe) for timeframe in chart_data},
+        **results,
         "mean_predictions": mean_predictions,
         "interactive_chart_path": interactive_chart.get("html_path"),
         "timestamp": datetime.now().isoformat()
@@ -102,9 +112,6 @@ def main():
     """
     Main function
     """
-    # Set up environment variables
-    setup_env()
-    
     if len(sys.argv) < 2:
         print("Usage: python main.py <symbol>")
         print("Available symbols: NQ, ES, YM")
@@ -115,6 +122,10 @@ def main():
         print(f"Invalid symbol: {symbol}. Choose from NQ, ES, YM.")
         sys.exit(1)
     
+    # Set up environment variables
+    setup_env()
+    configure_logging()
+    
     result = run_analysis(symbol)
     
     # Print the path to the interactive chart
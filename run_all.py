@@ -1,26 +1,54 @@
 import os
-import sys
-import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from setup_env import setup_env
+from main import run_analysis, configure_logging
+from tools.chart_scraper.chart_scraper import ChartScraper
+from tools.mean_analysis.mean_analyzer import MeanAnalyzer
+from tools.mean_analysis.mean_visualizer import MeanVisualizer
+
 def run_all():
     """
     Run analysis for all symbols
     """
     symbols = ["NQ", "ES", "YM"]
     
+    # Load environment variables once for all symbols
+    setup_env()
+    configure_logging()
+    
     print(f"Starting analysis for all symbols: {', '.join(symbols)}")
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-" * 50)
     
-    for symbol in symbols:
-        print(f"\nRunning analysis for {symbol}...")
-        try:
-            subprocess.run([sys.executable, "main.py", symbol], check=True)
-            print(f"Analysis for {symbol} completed successfully.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error running analysis for {symbol}: {e}")
-        print("-" * 50)
+    # Share one set of tools between the symbols, they keep no per-symbol state
+    chart_scraper = ChartScraper(data_dir="data")
+    mean_analyzer = MeanAnalyzer(data_dir="data")
+    mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
+    
+    # Analyze the symbols concurrently in this process, their API calls are I/O-bound.
+    # This relies on every chart being drawn on its own matplotlib Figure rather than
+    # through pyplot's global state, and on each symbol writing under its own directories.
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        futures = {
+            executor.submit(
+                run_analysis,
+                symbol,
+                chart_scraper=chart_scraper,
+                mean_analyzer=mean_analyzer,
+                mean_visualizer=mean_visualizer,
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result()
+                print(f"Analysis for {symbol} completed successfully.")
+            except Exception as e:
+                print(f"Error running analysis for {symbol}: {e}")
+            print("-" * 50)
     
     print("\nAll analyses completed.")
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -1,13 +1,10 @@
-import requests
-import json
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+from tools.alpha_vantage import ALPHA_VANTAGE_URL, session
 
-# Get the API key from the volume profile analyzer
-with open(os.path.join("tools", "volume_profile", "agno_tool.py"), "r") as f:
-    for line in f:
-        if "ALPHA_VANTAGE_API_KEY" in line:
-            api_key = line.strip().split("=")[1].strip('"\'')
-            break
+# Get Alpha Vantage API key from environment variables
+api_key = os.environ.get("ALPHA_VANTAGE_API_KEY", "4M6VASN5R8SRDP29")
 
 def search_symbol(keywords):
     """
@@ -19,9 +16,9 @@ def search_symbol(keywords):
     Returns:
         List of matching symbols
     """
-    url = f"https://www.alphavantage.co/query?function=SYMBOL_SEARCH&keywords={keywords}&apikey={api_key}"
-    response = requests.get(url)
-    data = response.json()
+    params = {"function": "SYMBOL_SEARCH", "keywords": keywords, "apikey": api_key}
+    response = session.get(ALPHA_VANTAGE_URL, params=params, timeout=10)
+    data = orjson.loads(response.content)
     
     if "bestMatches" in data:
         return data["bestMatches"]
@@ -29,51 +26,24 @@ def search_symbol(keywords):
         print(f"Error: {data}")
         return []
 
-# Search for NASDAQ 100 related symbols
-print("Searching for NASDAQ 100 related symbols...")
-nasdaq_symbols = search_symbol("NASDAQ 100")
-print(json.dumps(nasdaq_symbols, indent=2))
-print("\n")
-
-# Search for S&P 500 related symbols
-print("Searching for S&P 500 related symbols...")
-sp500_symbols = search_symbol("S&P 500")
-print(json.dumps(sp500_symbols, indent=2))
-print("\n")
-
-# Search for Dow Jones related symbols
-print("Searching for Dow Jones related symbols...")
-dow_symbols = search_symbol("Dow Jones")
-print(json.dumps(dow_symbols, indent=2))
-print("\n")
-
-# Search for specific ETFs
-print("Searching for QQQ...")
-qqq_symbols = search_symbol("QQQ")
-print(json.dumps(qqq_symbols, indent=2))
-print("\n")
-
-print("Searching for SPY...")
-spy_symbols = search_symbol("SPY")
-print(json.dumps(spy_symbols, indent=2))
-print("\n")
-
-print("Searching for DIA...")
-dia_symbols = search_symbol("DIA")
-print(json.dumps(dia_symbols, indent=2))
-print("\n")
-
-# Search for futures symbols
-print("Searching for NQ futures...")
-nq_symbols = search_symbol("NQ futures")
-print(json.dumps(nq_symbols, indent=2))
-print("\n")
-
-print("Searching for ES futures...")
-es_symbols = search_symbol("ES futures")
-print(json.dumps(es_symbols, indent=2))
-print("\n")
-
-print("Searching for YM futures...")
-ym_symbols = search_symbol("YM futures")
-print(json.dumps(ym_symbols, indent=2))
+# Searches to run, with the label printed for each
+searches = {
+    "NASDAQ 100": "NASDAQ 100 related symbols",
+    "S&P 500": "S&P 500 related symbols",
+    "Dow Jones": "Dow Jones related symbols",
+    "QQQ": "QQQ",
+    "SPY": "SPY",
+    "DIA": "DIA",
+    "NQ futures": "NQ futures",
+    "ES futures": "ES futures",
+    "YM futures": "YM futures",
+}
+
+# Run all searches concurrently, then print the results in order
+with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+    results = dict(zip(searches, executor.map(search_symbol, searches)))
+
+for keywords, label in searches.items():
+    print(f"Searching for {label}...")
+    print(orjson.dumps(results[keywords], option=orjson.OPT_INDENT_2).decode())
+    print("\n")
@@ -2,10 +2,17 @@ import os
 import sys
 import dotenv
 
+# Whether the environment has already been set up in this process
+_loaded = False
+
 def setup_env():
     """
     Set up environment variables from .env files
     """
+    global _loaded
+    if _loaded:
+        return
+    
     # Load environment variables from root .env file (if exists)
     root_env_file = ".env"
     if os.path.exists(root_env_file):
@@ -41,6 +48,7 @@ def setup_env():
     
     print("Environment variables loaded successfully.")
     print(f"API keys found: {', '.join(api_keys.keys())}")
+    _loaded = True
 
 if __name__ == "__main__":
     setup_env()
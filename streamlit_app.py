@@ -1,24 +1,20 @@
 import streamlit as st
 import os
+import logging
+import threading
 import pandas as pd
-import matplotlib.pyplot as plt
-import time
-import json
+import pyarrow as pa
 from datetime import datetime
-import threading
-import queue
-
-# Import our analysis functions
-from tools.chart_scraper.chart_scraper import ChartScraper
-from tools.mean_analysis.mean_analyzer import MeanAnalyzer
-from tools.mean_analysis.mean_visualizer import MeanVisualizer
-from tools.volume_profile.agno_tool import get_volume_profile
-from tools.sentiment_analyzer.agno_tool import get_alpha_vantage_sentiment
-from agents.deepseek import analyze_futures as deepseek_analyze
-from agents.gemini import analyze_futures as gemini_analyze
-from agents.groq import analyze_futures as groq_analyze
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# The analysis tools, agents and matplotlib are imported where they are first used,
+# so the page renders before those modules (and their SDKs) are loaded
 from setup_env import setup_env
 
+logger = logging.getLogger(__name__)
+
 # Set up environment variables
 setup_env()
 
@@ -30,100 +26,9 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Apply dark theme
-st.markdown("""
-<style>
-    .reportview-container {
-        background-color: #0e1117;
-        color: white;
-    }
-    .sidebar .sidebar-content {
-        background-color: #0e1117;
-        color: white;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: white !important;
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        background-color: #1a3a5f;
-        border-radius: 4px 4px 0 0;
-        gap: 10px;
-        padding-top: 10px;
-        padding-bottom: 10px;
-        padding-left: 20px;
-        padding-right: 20px;
-        margin-right: 5px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #0077b6;
-    }
-    .stMarkdown a {
-        color: #00b4d8;
-    }
-    .stDataFrame {
-        border: 1px solid #1a3a5f;
-    }
-    .css-1aumxhk {
-        background-color: #1a3a5f;
-    }
-    .css-1r6slb0 {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-    }
-    .css-12oz5g7 {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 100%;
-    }
-    .css-1v3fvcr {
-        max-width: 100%;
-    }
-    .css-18e3th9 {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        padding-left: 5rem;
-        padding-right: 5rem;
-    }
-    .css-1kyxreq {
-        display: flex;
-        flex-flow: row wrap;
-        row-gap: 1rem;
-    }
-    .css-12w0qpk {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-    .css-1fcdlhc {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-    .stButton>button {
-        background-color: #0077b6;
-        color: white;
-        border: none;
-        border-radius: 4px;
-        padding: 0.5rem 1rem;
-        font-weight: bold;
-    }
-    .stButton>button:hover {
-        background-color: #00b4d8;
-    }
-    .stProgress > div > div > div > div {
-        background-color: #0077b6;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Apply the style overrides, shared by both apps, that the theme in .streamlit/config.toml does not cover
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")) as css_file:
+    st.markdown(f"<style>{css_file.read()}</style>", unsafe_allow_html=True)
 
 # Create a session state to store analysis results
 if 'analysis_results' not in st.session_state:
@@ -134,66 +39,244 @@ if 'progress' not in st.session_state:
     st.session_state.progress = 0
 if 'status' not in st.session_state:
     st.session_state.status = ""
-if 'selected_timeframe' not in st.session_state:
-    st.session_state.selected_timeframe = "5d"
+
+@st.cache_resource
+def get_chart_scraper():
+    """Chart scraper shared by all sessions"""
+    from tools.chart_scraper.chart_scraper import ChartScraper
+    return ChartScraper(data_dir="data")
+
+@st.cache_resource
+def get_mean_analyzer():
+    """Mean analyzer shared by all sessions, so its cache of combined predictions is too"""
+    from tools.mean_analysis.mean_analyzer import MeanAnalyzer
+    return MeanAnalyzer(data_dir="data")
+
+@st.cache_resource
+def get_mean_visualizer():
+    """Mean visualizer shared by all sessions, built on the shared mean analyzer"""
+    from tools.mean_analysis.mean_visualizer import MeanVisualizer
+    return MeanVisualizer(analyzer=get_mean_analyzer())
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_image_bytes(path, mtime):
+    """PNG bytes of a chart, keyed by its modification time so a re-plotted chart is read again"""
+    with open(path, "rb") as f:
+        return f.read()
+
+@st.cache_resource
+def get_plot_pool():
+    """Worker processes shared by all sessions that render the mean prediction charts in parallel"""
+    from tools.mean_analysis.mean_analyzer import MeanAnalyzer
+    # Spawn rather than fork, forking the multithreaded server process is unsafe
+    return ProcessPoolExecutor(
+        max_workers=len(MeanAnalyzer.PREDICTION_TIMEFRAMES),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+def submit_plot(*args):
+    """Submit a chart to the plot pool, replacing the pool if a crashed worker has left it unusable"""
+    try:
+        return get_plot_pool().submit(*args)
+    except BrokenProcessPool:
+        get_plot_pool.clear()
+        return get_plot_pool().submit(*args)
+
+def downcast_ohlcv(df):
+    """Copy of OHLCV data with prices as float32 and volumes in the smallest integer type that fits"""
+    df = df.astype({column: "float32" for column in df.select_dtypes("float").columns})
+    for column in df.select_dtypes("integer").columns:
+        df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+def fetch_and_plot(chart_scraper, symbol, timeframe):
+    """Fetch the chart data of a timeframe, plot its chart and return a downcast copy, which is safe to do from any thread"""
+    data = chart_scraper.get_ticker_data(symbol, timeframe)
+    chart_scraper.plot_chart(symbol, timeframe, data=data)
+    # Downcast a copy, the fetched frame is shared with the download cache
+    return downcast_ohlcv(data)
+
+def scrape_charts(chart_scraper, symbol, on_complete=None):
+    """Fetch and plot every timeframe concurrently"""
+    chart_data = {}
+    with ThreadPoolExecutor(max_workers=len(chart_scraper.TIMEFRAMES)) as executor:
+        futures = {
+            executor.submit(fetch_and_plot, chart_scraper, symbol, timeframe): timeframe
+            for timeframe in chart_scraper.TIMEFRAMES
+        }
+        # Report progress from the script thread, where Streamlit calls are allowed
+        for completed, future in enumerate(as_completed(futures), 1):
+            timeframe = futures[future]
+            chart_data[timeframe] = future.result()
+            if on_complete:
+                on_complete(timeframe, completed)
+    
+    # Keep the timeframes in their usual order rather than the order they finished in
+    return {timeframe: chart_data[timeframe] for timeframe in chart_scraper.TIMEFRAMES}
+
+# Agent predictions are reused for ten minutes. The Alpha Vantage and Yahoo Finance
+# responses behind the other steps are already cached by the tools themselves.
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_deepseek_analyze(symbol):
+    """DeepSeek analysis of a symbol, cached"""
+    from agents.deepseek import analyze_futures as deepseek_analyze
+    return deepseek_analyze(symbol)
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_gemini_analyze(symbol):
+    """Gemini analysis of a symbol, cached"""
+    from agents.gemini import analyze_futures as gemini_analyze
+    return gemini_analyze(symbol)
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_groq_analyze(symbol):
+    """Groq analysis of a symbol, cached"""
+    from agents.groq import analyze_futures as groq_analyze
+    return groq_analyze(symbol)
+
+def volume_profile_analysis(symbol):
+    """Volume profile analysis of a symbol's 5-minute intraday data"""
+    from tools.volume_profile.agno_tool import get_volume_profile
+    return get_volume_profile(symbol, interval="5min")
+
+def news_sentiment_analysis(symbol):
+    """News sentiment analysis of a symbol"""
+    from tools.sentiment_analyzer.agno_tool import get_alpha_vantage_sentiment
+    return get_alpha_vantage_sentiment(symbol)
+
+# Independent API calls of an analysis, keyed by their result name, with a label for progress messages
+ANALYSIS_TASKS = {
+    "volume_profile_analysis": ("Volume profile", volume_profile_analysis),
+    "news_sentiment_analysis": ("News sentiment", news_sentiment_analysis),
+    "deepseek_result": ("DeepSeek", cached_deepseek_analyze),
+    "gemini_result": ("Gemini", cached_gemini_analyze),
+    "groq_result": ("Groq", cached_groq_analyze),
+}
+
+def run_analysis_tasks(symbol, on_complete=None):
+    """Run the Alpha Vantage analyses and LLM agents concurrently, returning their results and messages for those that failed"""
+    task_results = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=len(ANALYSIS_TASKS)) as executor:
+        futures = {executor.submit(task, symbol): name for name, (_, task) in ANALYSIS_TASKS.items()}
+        for completed, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                task_results[name] = future.result()
+            except Exception as e:
+                logger.error("[%s] Error with %s: %s", symbol, name, e)
+                task_results[name] = f"Error: {str(e)}"
+                errors.append(f"Error with {ANALYSIS_TASKS[name][0]}: {e}")
+            
+            # Report progress from the script thread, where Streamlit calls are allowed
+            if on_complete:
+                on_complete(ANALYSIS_TASKS[name][0], completed)
+    return task_results, errors
+
+def analysis_bucket():
+    """Ten-minute time bucket within which a symbol's analysis is reused"""
+    now = datetime.now()
+    return f"{now:%Y%m%d%H}{now.minute // 10}"
+
+@st.cache_resource
+def recent_analyses():
+    """Results of recent analyses keyed by (symbol, bucket), shared by all sessions, and the lock guarding them"""
+    return threading.Lock(), {}
+
+def recall_analysis(symbol, bucket):
+    """Results of an analysis of the symbol in this bucket, or None"""
+    lock, analyses = recent_analyses()
+    with lock:
+        return analyses.get((symbol, bucket))
+
+def remember_analysis(symbol, bucket, results):
+    """Store the results of an analysis, dropping those from earlier buckets"""
+    lock, analyses = recent_analyses()
+    with lock:
+        for key in [key for key in analyses if key[1] != bucket]:
+            del analyses[key]
+        analyses[(symbol, bucket)] = results
 
 # Define analysis steps
-def run_analysis(symbol):
-    """Run the full analysis for a symbol"""
-    results = {}
+def run_analysis(symbol, report=None):
+    """Run the full analysis for a symbol, passing each step's progress (0-100) and status message to report"""
+    report = report or (lambda progress, status: None)
+    
+    # Reuse an analysis of the same symbol from the last few minutes
+    bucket = analysis_bucket()
+    results = recall_analysis(symbol, bucket)
+    if results is not None:
+        return results
     
     # Step 1: Create data directory
     os.makedirs("data", exist_ok=True)
+    report(5, "Creating data directory...")
     
     # Step 2: Initialize chart scraper
-    chart_scraper = ChartScraper(data_dir="data")
+    chart_scraper = get_chart_scraper()
+    report(10, "Initializing chart scraper...")
     
     # Step 3: Scrape chart data
-    chart_data = {}
-    for timeframe in chart_scraper.TIMEFRAMES:
-        chart_data[timeframe] = chart_scraper.get_ticker_data(symbol, timeframe)
-        chart_scraper.plot_chart(symbol, timeframe)
+    report(10, "Scraping chart data...")
     
-    # Step 4: Get volume profile analysis
-    volume_profile_analysis = get_volume_profile(symbol, interval="5min")
+    def chart_plotted(timeframe, completed):
+        report(10 + int(20 * completed / len(chart_scraper.TIMEFRAMES)), f"Plotted chart for {timeframe}...")
     
-    # Step 5: Get news sentiment analysis
-    news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
+    chart_data = scrape_charts(chart_scraper, symbol, on_complete=chart_plotted)
     
-    # Step 6: Run analysis with DeepSeek
-    deepseek_result = deepseek_analyze(symbol)
+    # Steps 4-8: Get volume profile and news sentiment analyses and run DeepSeek, Gemini and Groq concurrently
+    report(30, "Running volume profile, news sentiment, DeepSeek, Gemini and Groq analyses...")
     
-    # Step 7: Run analysis with Gemini
-    gemini_result = gemini_analyze(symbol)
+    def task_finished(label, completed):
+        report(30 + 10 * completed, f"{label} analysis finished ({completed}/{len(ANALYSIS_TASKS)})...")
     
-    # Step 8: Run analysis with Groq
-    groq_result = groq_analyze(symbol)
+    task_results, warnings = run_analysis_tasks(symbol, on_complete=task_finished)
     
     # Step 9: Combine predictions
-    mean_analyzer = MeanAnalyzer(data_dir="data")
-    mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
+    report(80, "Combining predictions...")
+    from tools.mean_analysis.mean_visualizer import render_mean_prediction
+    mean_analyzer = get_mean_analyzer()
+    mean_visualizer = get_mean_visualizer()
     
+    # Collect failures and show them together with the results
     mean_predictions = {}
+    plot_futures = {}
     for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES:
         try:
             mean_predictions[timeframe] = mean_analyzer.combine_predictions(symbol, timeframe)
-            mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
         except Exception as e:
-            print(f"Error with {timeframe}: {e}")
+            logger.warning("[%s] Error with %s: %s", symbol, timeframe, e)
+            warnings.append(f"Error with {timeframe}: {e}")
+            continue
+        
+        # Render the charts of all timeframes in parallel in the worker processes
+        plot_futures[timeframe] = submit_plot(
+            render_mean_prediction, mean_analyzer.data_dir, symbol, timeframe, chart_data[timeframe]
+        )
+    
+    for timeframe, future in plot_futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning("[%s] Error with %s: %s", symbol, timeframe, e)
+            warnings.append(f"Error with {timeframe}: {e}")
     
     # Step 10: Create interactive chart
-    interactive_chart = mean_visualizer.create_interactive_chart(symbol)
+    report(90, "Creating interactive chart...")
+    interactive_chart = mean_visualizer.create_interactive_chart(
+        symbol,
+        volume_profile_analysis=task_results["volume_profile_analysis"],
+        news_sentiment_analysis=task_results["news_sentiment_analysis"],
+    )
     
     # Prepare result
     results = {
         "symbol": symbol,
-        "chart_data": {timeframe: chart_data[timeframe].to_dict() for timeframe in chart_data},
-        "volume_profile_analysis": volume_profile_analysis,
-        "news_sentiment_analysis": news_sentiment_analysis,
-        "deepseek_result": deepseek_result,
-        "gemini_result": gemini_result,
-        "groq_result": groq_result,
+        # Immutable Arrow tables, convert with to_pandas() where a DataFrame is needed
+        "chart_data": {timeframe: pa.Table.from_pandas(data, preserve_index=True) for timeframe, data in chart_data.items()},
+        **task_results,
         "mean_predictions": mean_predictions,
+        "warnings": warnings,
         "interactive_chart_path": interactive_chart.get("html_path"),
         "timestamp": datetime.now().isoformat(),
         "chart_paths": {
@@ -202,6 +285,9 @@ def run_analysis(symbol):
         }
     }
     
+    # Only share complete analyses, a failed API call should not be served to everyone for ten minutes
+    if not warnings:
+        remember_analysis(symbol, bucket, results)
     return results
 
 # Function to start analysis
@@ -216,111 +302,83 @@ def start_analysis(symbol):
     st.session_state.progress = 0
     st.session_state.status = "Starting analysis..."
     st.session_state.analysis_results = None
-    st.session_state.start_time = time.time()
-    
-    # Create a placeholder for the progress bar
-    progress_placeholder = st.empty()
-    status_placeholder = st.empty()
     
-    # Run analysis step by step with progress updates
-    try:
-        # Step 1: Create data directory
-        os.makedirs("data", exist_ok=True)
-        progress_placeholder.progress(5)
-        status_placeholder.text("Creating data directory...")
-        
-        # Step 2: Initialize chart scraper
-        chart_scraper = ChartScraper(data_dir="data")
-        progress_placeholder.progress(10)
-        status_placeholder.text("Initializing chart scraper...")
-        
-        # Step 3: Scrape chart data
-        chart_data = {}
-        for i, timeframe in enumerate(chart_scraper.TIMEFRAMES):
-            status_placeholder.text(f"Scraping chart data for {timeframe}...")
-            chart_data[timeframe] = chart_scraper.get_ticker_data(symbol, timeframe)
-            chart_scraper.plot_chart(symbol, timeframe)
-            progress = 10 + int(20 * (i + 1) / len(chart_scraper.TIMEFRAMES))
-            progress_placeholder.progress(progress)
+    # Show the steps in a single status container that finalizes in place
+    with st.status("Starting analysis...", expanded=True) as status_container:
+        def report(progress, status):
+            status_container.update(label=f"{status} ({progress}%)")
         
-        # Step 4: Get volume profile analysis
-        status_placeholder.text("Analyzing volume profile...")
-        progress_placeholder.progress(30)
-        volume_profile_analysis = get_volume_profile(symbol, interval="5min")
-        
-        # Step 5: Get news sentiment analysis
-        status_placeholder.text("Analyzing news sentiment...")
-        progress_placeholder.progress(40)
-        news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
-        
-        # Step 6: Run analysis with DeepSeek
-        status_placeholder.text("Running DeepSeek analysis...")
-        progress_placeholder.progress(50)
-        deepseek_result = deepseek_analyze(symbol)
-        
-        # Step 7: Run analysis with Gemini
-        status_placeholder.text("Running Gemini analysis...")
-        progress_placeholder.progress(60)
-        gemini_result = gemini_analyze(symbol)
-        
-        # Step 8: Run analysis with Groq
-        status_placeholder.text("Running Groq analysis...")
-        progress_placeholder.progress(70)
-        groq_result = groq_analyze(symbol)
-        
-        # Step 9: Combine predictions
-        status_placeholder.text("Combining predictions...")
-        progress_placeholder.progress(80)
-        mean_analyzer = MeanAnalyzer(data_dir="data")
-        mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
-        
-        mean_predictions = {}
-        for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES:
-            try:
-                mean_predictions[timeframe] = mean_analyzer.combine_predictions(symbol, timeframe)
-                mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
-            except Exception as e:
-                print(f"Error with {timeframe}: {e}")
-        
-        # Step 10: Create interactive chart
-        status_placeholder.text("Creating interactive chart...")
-        progress_placeholder.progress(90)
-        interactive_chart = mean_visualizer.create_interactive_chart(symbol)
-        
-        # Prepare result
-        results = {
-            "symbol": symbol,
-            "chart_data": {timeframe: chart_data[timeframe].to_dict() for timeframe in chart_data},
-            "volume_profile_analysis": volume_profile_analysis,
-            "news_sentiment_analysis": news_sentiment_analysis,
-            "deepseek_result": deepseek_result,
-            "gemini_result": gemini_result,
-            "groq_result": groq_result,
-            "mean_predictions": mean_predictions,
-            "interactive_chart_path": interactive_chart.get("html_path"),
-            "timestamp": datetime.now().isoformat(),
-            "chart_paths": {
-                timeframe: os.path.join("data", "mean_analysis", symbol, "charts", f"{timeframe}.png")
-                for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES
-            }
-        }
-        
-        # Update session state with results
-        st.session_state.analysis_results = results
-        st.session_state.analysis_running = False
-        progress_placeholder.progress(100)
-        status_placeholder.text("Analysis complete!")
-        
-        # Force a rerun to update the UI with the results
-        st.rerun()
-        
-    except Exception as e:
-        # Handle errors
-        st.session_state.status = f"Error: {str(e)}"
-        st.session_state.progress = 0
-        st.session_state.analysis_running = False
-        status_placeholder.text(f"Error: {str(e)}")
-        progress_placeholder.empty()
+        try:
+            results = run_analysis(symbol, report=report)
+            
+            # Update session state with results, which are displayed further down in this run
+            st.session_state.analysis_results = results
+            st.session_state.analysis_running = False
+            status_container.update(label="Analysis complete!", state="complete", expanded=False)
+            
+        except Exception as e:
+            # Handle errors
+            st.session_state.status = f"Error: {str(e)}"
+            st.session_state.progress = 0
+            st.session_state.analysis_running = False
+            status_container.update(label=f"Error: {str(e)}", state="error")
+
+def agent_card_html(agent, prediction):
+    """HTML card with an agent's prediction, or an empty slot if the agent has none"""
+    if prediction is None:
+        return '<div style="flex: 1;"></div>'
+    
+    prediction_label = prediction.get('prediction_label', 'Hold')
+    signal_strength = prediction.get('signal_strength', 0.5)
+    
+    # Set color based on prediction
+    color = "#198754" if prediction_label == "Buy" else "#dc3545" if prediction_label == "Sell" else "#0dcaf0"
+    
+    return f"""
+        <div style="flex: 1; background-color: #1a3a5f; padding: 15px; border-radius: 10px;">
+            <h4 style="margin-top: 0;">{agent.capitalize()}</h4>
+            <div style="background-color: rgba(30, 30, 30, 0.5); padding: 5px 10px; border-radius: 4px; display: inline-block; margin: 10px 0; color: {color};">
+                {prediction_label} (Confidence: {signal_strength:.2f})
+            </div>
+            <p><strong>Technical Analysis:</strong> {prediction.get('technical_analysis', 'N/A')}</p>
+            <p><strong>Sentiment Analysis:</strong> {prediction.get('sentiment_analysis', 'N/A')}</p>
+        </div>"""
+
+# Rerun only the timeframe tab being interacted with (st.fragment needs Streamlit 1.37, older versions rerun the page)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+@fragment
+def render_timeframe(results, timeframe):
+    """Render the chart and analyses of one timeframe tab"""
+    # Display chart
+    chart_path = results['chart_paths'].get(timeframe)
+    if chart_path and os.path.exists(chart_path):
+        st.image(load_image_bytes(chart_path, os.path.getmtime(chart_path)), use_container_width=True)
+    else:
+        st.warning(f"Chart for {timeframe} not found.")
+    
+    # Display agent analyses
+    st.subheader("Agent Analyses")
+    
+    # Get mean prediction for this timeframe
+    mean_prediction = results['mean_predictions'].get(timeframe, {})
+    agent_predictions = mean_prediction.get('agent_predictions', {})
+    
+    # Display one card per agent in a single row
+    if agent_predictions:
+        cards = "".join(agent_card_html(agent, agent_predictions.get(agent)) for agent in ["deepseek", "gemini", "groq"])
+        st.markdown(f'<div style="display: flex; gap: 1rem;">{cards}</div>', unsafe_allow_html=True)
+    
+    # Display additional analyses
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Volume Profile Analysis")
+        st.text(results['volume_profile_analysis'])
+    
+    with col2:
+        st.subheader("News Sentiment Analysis")
+        st.text(results['news_sentiment_analysis'])
 
 # Main app layout
 st.title("📈 Futures Market Analysis")
@@ -352,98 +410,45 @@ if st.session_state.analysis_results:
     st.header(f"{results['symbol']} Futures Analysis")
     st.subheader(f"Generated on: {datetime.fromisoformat(results['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Create dashboard cards
-    col1, col2, col3 = st.columns(3)
-    
     # Get the latest prediction
     mean_prediction = results['mean_predictions'].get('intraday', {})
     prediction_label = mean_prediction.get('prediction_label', 'Hold')
     signal_strength = mean_prediction.get('signal_strength', 0.5)
+    color = "#198754" if prediction_label == "Buy" else "#dc3545" if prediction_label == "Sell" else "#0dcaf0"
     
-    # Display dashboard cards
-    with col1:
-        st.markdown("""
-        <div style="background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
+    # Display dashboard cards in a single row
+    st.markdown(f"""
+    <div style="display: flex; gap: 1rem;">
+        <div style="flex: 1; background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
             <h3 style="margin-top: 0;">Symbol</h3>
-            <div style="font-size: 24px; font-weight: bold; margin: 10px 0;">{}</div>
+            <div style="font-size: 24px; font-weight: bold; margin: 10px 0;">{results['symbol']}</div>
             <div style="font-size: 14px; color: #ccc;">Futures Contract</div>
         </div>
-        """.format(results['symbol']), unsafe_allow_html=True)
-    
-    with col2:
-        color = "#198754" if prediction_label == "Buy" else "#dc3545" if prediction_label == "Sell" else "#0dcaf0"
-        st.markdown("""
-        <div style="background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
+        <div style="flex: 1; background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
             <h3 style="margin-top: 0;">Mean Prediction</h3>
-            <div style="font-size: 24px; font-weight: bold; margin: 10px 0; color: {};">{}</div>
+            <div style="font-size: 24px; font-weight: bold; margin: 10px 0; color: {color};">{prediction_label}</div>
             <div style="font-size: 14px; color: #ccc;">Consensus from all agents</div>
         </div>
-        """.format(color, prediction_label), unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div style="background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
+        <div style="flex: 1; background-color: #1a3a5f; padding: 20px; border-radius: 10px; text-align: center;">
             <h3 style="margin-top: 0;">Signal Strength</h3>
-            <div style="font-size: 24px; font-weight: bold; margin: 10px 0;">{:.2f}</div>
+            <div style="font-size: 24px; font-weight: bold; margin: 10px 0;">{signal_strength:.2f}</div>
             <div style="font-size: 14px; color: #ccc;">Confidence level (0-1)</div>
         </div>
-        """.format(signal_strength), unsafe_allow_html=True)
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Display failures of the analysis in one place
+    if results.get('warnings'):
+        with st.expander("Warnings"):
+            st.text("\n".join(results['warnings']))
     
     # Create tabs for different timeframes
     timeframe_tabs = st.tabs(["Intraday", "5 Days", "30 Days"])
     
     # Display charts and analysis for each timeframe
-    for i, (tab, timeframe) in enumerate(zip(timeframe_tabs, ["intraday", "5d", "30d"])):
+    for tab, timeframe in zip(timeframe_tabs, ["intraday", "5d", "30d"]):
         with tab:
-            # Display chart
-            chart_path = results['chart_paths'].get(timeframe)
-            if chart_path and os.path.exists(chart_path):
-                st.image(chart_path, use_container_width=True)
-            else:
-                st.warning(f"Chart for {timeframe} not found.")
-            
-            # Display agent analyses
-            st.subheader("Agent Analyses")
-            
-            # Create columns for each agent
-            agent_cols = st.columns(3)
-            
-            # Get mean prediction for this timeframe
-            mean_prediction = results['mean_predictions'].get(timeframe, {})
-            agent_predictions = mean_prediction.get('agent_predictions', {})
-            
-            # Display agent predictions
-            for i, (agent, col) in enumerate(zip(["deepseek", "gemini", "groq"], agent_cols)):
-                if agent in agent_predictions:
-                    prediction = agent_predictions[agent]
-                    prediction_label = prediction.get('prediction_label', 'Hold')
-                    signal_strength = prediction.get('signal_strength', 0.5)
-                    
-                    # Set color based on prediction
-                    color = "#198754" if prediction_label == "Buy" else "#dc3545" if prediction_label == "Sell" else "#0dcaf0"
-                    
-                    with col:
-                        st.markdown(f"""
-                        <div style="background-color: #1a3a5f; padding: 15px; border-radius: 10px;">
-                            <h4 style="margin-top: 0;">{agent.capitalize()}</h4>
-                            <div style="background-color: rgba(30, 30, 30, 0.5); padding: 5px 10px; border-radius: 4px; display: inline-block; margin: 10px 0; color: {color};">
-                                {prediction_label} (Confidence: {signal_strength:.2f})
-                            </div>
-                            <p><strong>Technical Analysis:</strong> {prediction.get('technical_analysis', 'N/A')}</p>
-                            <p><strong>Sentiment Analysis:</strong> {prediction.get('sentiment_analysis', 'N/A')}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-            
-            # Display additional analyses
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("Volume Profile Analysis")
-                st.text(results['volume_profile_analysis'])
-            
-            with col2:
-                st.subheader("News Sentiment Analysis")
-                st.text(results['news_sentiment_analysis'])
+            render_timeframe(results, timeframe)
 
 # Display instructions if no analysis has been run
 if not st.session_state.analysis_results and not st.session_state.analysis_running:
@@ -455,6 +460,6 @@ if not st.session_state.analysis_results and not st.session_state.analysis_runni
     
     sample_image_path = "data/mean_analysis/NQ/charts/5d.png"
     if os.path.exists(sample_image_path):
-        st.image(sample_image_path, use_container_width=True)
+        st.image(load_image_bytes(sample_image_path, os.path.getmtime(sample_image_path)), use_container_width=True)
     else:
         st.markdown("Run an analysis first to see sample results.")
@@ -1,12 +1,13 @@
 import streamlit as st
 import os
+import logging
 import pandas as pd
-import matplotlib.pyplot as plt
 import time
 import json
 from datetime import datetime
 import threading
 import queue
+import asyncio
 
 # Import our analysis functions
 from tools.chart_scraper.chart_scraper import ChartScraper
@@ -22,6 +23,9 @@ from setup_env import setup_env
 # Import authentication and payment modules
 from auth import Authentication, PaymentProcessor, Database
 
+# Same logger as main.run_analysis, so pipeline failures are reported the same way
+logger = logging.getLogger("analysis")
+
 # Set up environment variables
 setup_env()
 
@@ -33,104 +37,18 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Apply dark theme
-st.markdown("""
-<style>
-    .reportview-container {
-        background-color: #0e1117;
-        color: white;
-    }
-    .sidebar .sidebar-content {
-        background-color: #0e1117;
-        color: white;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: white !important;
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        background-color: #1a3a5f;
-        border-radius: 4px 4px 0 0;
-        gap: 10px;
-        padding-top: 10px;
-        padding-bottom: 10px;
-        padding-left: 20px;
-        padding-right: 20px;
-        margin-right: 5px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #0077b6;
-    }
-    .stMarkdown a {
-        color: #00b4d8;
-    }
-    .stDataFrame {
-        border: 1px solid #1a3a5f;
-    }
-    .css-1aumxhk {
-        background-color: #1a3a5f;
-    }
-    .css-1r6slb0 {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-    }
-    .css-12oz5g7 {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 100%;
-    }
-    .css-1v3fvcr {
-        max-width: 100%;
-    }
-    .css-18e3th9 {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        padding-left: 5rem;
-        padding-right: 5rem;
-    }
-    .css-1kyxreq {
-        display: flex;
-        flex-flow: row wrap;
-        row-gap: 1rem;
-    }
-    .css-12w0qpk {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-    .css-1fcdlhc {
-        background-color: #1a3a5f;
-        border: 1px solid #1a3a5f;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 1rem;
-    }
-    .stButton>button {
-        background-color: #0077b6;
-        color: white;
-        border: none;
-        border-radius: 4px;
-        padding: 0.5rem 1rem;
-        font-weight: bold;
-    }
-    .stButton>button:hover {
-        background-color: #00b4d8;
-    }
-    .stProgress > div > div > div > div {
-        background-color: #0077b6;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Apply the style overrides, shared by both apps, that the theme in .streamlit/config.toml does not cover
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")) as css_file:
+    st.markdown(f"<style>{css_file.read()}</style>", unsafe_allow_html=True)
+
+@st.cache_resource
+def get_db():
+    """Open the shared database once per server process"""
+    return Database()
 
-# Initialize authentication
-auth = Authentication()
-db = Database()
+# Initialize authentication, both it and the payment processor use the shared database
+db = get_db()
+auth = Authentication(db)
 payment_processor = PaymentProcessor(db)
 
 # Create a session state to store analysis results
@@ -145,49 +63,156 @@ if 'status' not in st.session_state:
 if 'selected_timeframe' not in st.session_state:
     st.session_state.selected_timeframe = "5d"
 
-# Define analysis steps
-def run_analysis(symbol):
-    """Run the full analysis for a symbol"""
-    results = {}
-    
-    # Step 1: Create data directory
-    os.makedirs("data", exist_ok=True)
-    
-    # Step 2: Initialize chart scraper
-    chart_scraper = ChartScraper(data_dir="data")
+@st.cache_resource
+def get_chart_scraper():
+    """Chart scraper shared by all sessions"""
+    return ChartScraper(data_dir="data")
+
+@st.cache_resource
+def get_mean_analyzer():
+    """Mean analyzer shared by all sessions, so its cache of combined predictions is too"""
+    return MeanAnalyzer(data_dir="data")
+
+@st.cache_resource
+def get_mean_visualizer():
+    """Mean visualizer shared by all sessions, built on the shared mean analyzer"""
+    return MeanVisualizer(analyzer=get_mean_analyzer())
+
+# Agent predictions are reused for ten minutes. The Alpha Vantage and Yahoo Finance
+# responses behind the other steps are already cached by the tools themselves.
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_deepseek_analyze(symbol):
+    """DeepSeek analysis of a symbol, cached"""
+    return deepseek_analyze(symbol)
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_gemini_analyze(symbol):
+    """Gemini analysis of a symbol, cached"""
+    return gemini_analyze(symbol)
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def cached_groq_analyze(symbol):
+    """Groq analysis of a symbol, cached"""
+    return groq_analyze(symbol)
+
+async def run_blocking(name, func, *args, **kwargs):
+    """Run a blocking call in a worker thread and return its result with the given name"""
+    return name, await asyncio.to_thread(func, *args, **kwargs)
+
+def fetch_and_plot(chart_scraper, symbol, timeframe):
+    """Fetch the chart data of a timeframe and plot its chart, which is safe to do from any thread"""
+    data = chart_scraper.get_ticker_data(symbol, timeframe)
+    chart_scraper.plot_chart(symbol, timeframe, data=data)
+    return data
+
+async def gather_data(chart_scraper, symbol, on_complete=None):
+    """Fetch and plot the chart data of every timeframe and get the volume profile and news sentiment analyses concurrently"""
+    calls = [run_blocking(timeframe, fetch_and_plot, chart_scraper, symbol, timeframe) for timeframe in chart_scraper.TIMEFRAMES]
+    calls.append(run_blocking("volume_profile_analysis", get_volume_profile, symbol, interval="5min"))
+    calls.append(run_blocking("news_sentiment_analysis", get_alpha_vantage_sentiment, symbol))
     
-    # Step 3: Scrape chart data
     chart_data = {}
-    for timeframe in chart_scraper.TIMEFRAMES:
-        chart_data[timeframe] = chart_scraper.get_ticker_data(symbol, timeframe)
-        chart_scraper.plot_chart(symbol, timeframe)
+    analyses = {}
+    for completed, call in enumerate(asyncio.as_completed(calls), 1):
+        name, result = await call
+        if name in chart_scraper.TIMEFRAMES:
+            chart_data[name] = result
+        else:
+            analyses[name] = result
+        
+        # Report progress from the event loop thread, which is the script thread where Streamlit calls are allowed
+        if on_complete:
+            on_complete(name, completed, len(calls))
+    return chart_data, analyses
+
+# LLM agents keyed by their result name, with a label for progress messages and panels
+AGENTS = {
+    "deepseek_result": ("DeepSeek", cached_deepseek_analyze),
+    "gemini_result": ("Gemini", cached_gemini_analyze),
+    "groq_result": ("Groq", cached_groq_analyze),
+}
+
+async def run_agents(symbol, on_complete=None):
+    """Run the DeepSeek, Gemini and Groq analyses concurrently, since each one mostly waits on a remote LLM"""
+    calls = [run_blocking(name, analyze, symbol) for name, (_, analyze) in AGENTS.items()]
     
-    # Step 4: Get volume profile analysis
-    volume_profile_analysis = get_volume_profile(symbol, interval="5min")
+    agent_results = {}
+    for completed, call in enumerate(asyncio.as_completed(calls), 1):
+        name, agent_results[name] = await call
+        if on_complete:
+            on_complete(name, completed, len(calls), agent_results[name])
+    return agent_results
+
+def agent_panel_html(label, result):
+    """HTML panel listing an agent's prediction for each timeframe"""
+    rows = []
+    for item in result.get("analysis", []):
+        if "prediction_label" in item:
+            rows.append(f"<p><strong>{item.get('timeframe', 'N/A')}:</strong> {item['prediction_label']} (Confidence: {item.get('signal_strength', 0.5):.2f})</p>")
+        else:
+            rows.append(f"<p>{item.get('error', 'No prediction')}</p>")
     
-    # Step 5: Get news sentiment analysis
-    news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
+    return f"""
+    <div style="background-color: #1a3a5f; padding: 15px; border-radius: 10px;">
+        <h4 style="margin-top: 0;">{label}</h4>
+        {"".join(rows)}
+    </div>
+    """
+
+def combine_and_plot(mean_analyzer, mean_visualizer, symbol, timeframe, chart_data):
+    """Combine the agents' predictions for a timeframe and plot its mean prediction chart"""
+    mean_prediction = mean_analyzer.combine_predictions(symbol, timeframe)
+    try:
+        mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
+    except Exception as e:
+        logger.warning("[%s] Error plotting %s: %s", symbol, timeframe, e)
+    return mean_prediction
+
+async def combine_timeframes(mean_analyzer, mean_visualizer, symbol, chart_data):
+    """Combine predictions and plot the mean prediction charts of every timeframe concurrently"""
+    timeframes = mean_analyzer.PREDICTION_TIMEFRAMES
+    results = await asyncio.gather(
+        *(run_blocking(timeframe, combine_and_plot, mean_analyzer, mean_visualizer, symbol, timeframe, chart_data) for timeframe in timeframes),
+        return_exceptions=True,
+    )
     
-    # Step 6: Run analysis with DeepSeek
-    deepseek_result = deepseek_analyze(symbol)
+    # Skip timeframes whose predictions could not be combined
+    mean_predictions = {}
+    for timeframe, result in zip(timeframes, results):
+        if isinstance(result, Exception):
+            logger.error("[%s] Error combining %s predictions: %s", symbol, timeframe, result)
+        else:
+            mean_predictions[timeframe] = result[1]
+    return mean_predictions
+
+async def run_pipeline(chart_scraper, mean_analyzer, mean_visualizer, symbol, on_data=None, on_agent=None, on_combine=None):
+    """Gather the chart data and Alpha Vantage analyses, run the agents, then combine their predictions, all in one event loop"""
+    chart_data, analyses = await gather_data(chart_scraper, symbol, on_complete=on_data)
+    agent_results = await run_agents(symbol, on_complete=on_agent)
     
-    # Step 7: Run analysis with Gemini
-    gemini_result = gemini_analyze(symbol)
+    if on_combine:
+        on_combine()
+    mean_predictions = await combine_timeframes(mean_analyzer, mean_visualizer, symbol, chart_data)
+    return chart_data, analyses, agent_results, mean_predictions
+
+# Define analysis steps
+def run_analysis(symbol):
+    """Run the full analysis for a symbol"""
+    results = {}
     
-    # Step 8: Run analysis with Groq
-    groq_result = groq_analyze(symbol)
+    # Step 1: Create data directory
+    os.makedirs("data", exist_ok=True)
     
-    # Step 9: Combine predictions
-    mean_analyzer = MeanAnalyzer(data_dir="data")
-    mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
+    # Step 2: Initialize chart scraper, mean analyzer and visualizer
+    chart_scraper = get_chart_scraper()
+    mean_analyzer = get_mean_analyzer()
+    mean_visualizer = get_mean_visualizer()
     
-    mean_predictions = {}
-    for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES:
-        try:
-            mean_predictions[timeframe] = mean_analyzer.combine_predictions(symbol, timeframe)
-            mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
-        except Exception as e:
-            print(f"Error with {timeframe}: {e}")
+    # Steps 3-9: Scrape chart data and get volume profile and news sentiment analyses concurrently,
+    # then run analysis with DeepSeek, Gemini and Groq concurrently and combine their predictions
+    chart_data, analyses, agent_results, mean_predictions = asyncio.run(
+        run_pipeline(chart_scraper, mean_analyzer, mean_visualizer, symbol)
+    )
     
     # Step 10: Create interactive chart
     interactive_chart = mean_visualizer.create_interactive_chart(symbol)
@@ -195,12 +220,9 @@ def run_analysis(symbol):
     # Prepare result
     results = {
         "symbol": symbol,
-        "chart_data": {timeframe: chart_data[timeframe].to_dict() for timeframe in chart_data},
-        "volume_profile_analysis": volume_profile_analysis,
-        "news_sentiment_analysis": news_sentiment_analysis,
-        "deepseek_result": deepseek_result,
-        "gemini_result": gemini_result,
-        "groq_result": groq_result,
+        "chart_data": chart_data,
+        **analyses,
+        **agent_results,
         "mean_predictions": mean_predictions,
         "interactive_chart_path": interactive_chart.get("html_path"),
         "timestamp": datetime.now().isoformat(),
@@ -246,58 +268,44 @@ def start_analysis(symbol):
         progress_placeholder.progress(5)
         status_placeholder.text("Creating data directory...")
         
-        # Step 2: Initialize chart scraper
-        chart_scraper = ChartScraper(data_dir="data")
+        # Step 2: Initialize chart scraper, mean analyzer and visualizer
+        chart_scraper = get_chart_scraper()
+        mean_analyzer = get_mean_analyzer()
+        mean_visualizer = get_mean_visualizer()
         progress_placeholder.progress(10)
         status_placeholder.text("Initializing chart scraper...")
         
-        # Step 3: Scrape chart data
-        chart_data = {}
-        for i, timeframe in enumerate(chart_scraper.TIMEFRAMES):
-            status_placeholder.text(f"Scraping chart data for {timeframe}...")
-            chart_data[timeframe] = chart_scraper.get_ticker_data(symbol, timeframe)
-            chart_scraper.plot_chart(symbol, timeframe)
-            progress = 10 + int(20 * (i + 1) / len(chart_scraper.TIMEFRAMES))
-            progress_placeholder.progress(progress)
-        
-        # Step 4: Get volume profile analysis
-        status_placeholder.text("Analyzing volume profile...")
-        progress_placeholder.progress(30)
-        volume_profile_analysis = get_volume_profile(symbol, interval="5min")
-        
-        # Step 5: Get news sentiment analysis
-        status_placeholder.text("Analyzing news sentiment...")
-        progress_placeholder.progress(40)
-        news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
+        # Steps 3-5: Scrape chart data and get volume profile and news sentiment analyses concurrently
+        status_placeholder.text("Scraping chart data and analyzing volume profile and news sentiment...")
         
-        # Step 6: Run analysis with DeepSeek
-        status_placeholder.text("Running DeepSeek analysis...")
-        progress_placeholder.progress(50)
-        deepseek_result = deepseek_analyze(symbol)
+        def data_gathered(name, completed, total):
+            status_placeholder.text(f"Finished {name.replace('_', ' ')} ({completed}/{total})...")
+            progress_placeholder.progress(10 + int(40 * completed / total))
         
-        # Step 7: Run analysis with Gemini
-        status_placeholder.text("Running Gemini analysis...")
-        progress_placeholder.progress(60)
-        gemini_result = gemini_analyze(symbol)
+        # Steps 6-8: Run analysis with DeepSeek, Gemini and Groq concurrently once the data is in,
+        # filling in each agent's panel as soon as its analysis arrives
+        agent_panels = {name: column.empty() for name, column in zip(AGENTS, st.columns(len(AGENTS)))}
+        for name, panel in agent_panels.items():
+            panel.info(f"Waiting for {AGENTS[name][0]}...")
         
-        # Step 8: Run analysis with Groq
-        status_placeholder.text("Running Groq analysis...")
-        progress_placeholder.progress(70)
-        groq_result = groq_analyze(symbol)
+        def agent_finished(name, completed, total, result):
+            label = AGENTS[name][0]
+            agent_panels[name].markdown(agent_panel_html(label, result), unsafe_allow_html=True)
+            status_placeholder.text(f"{label} analysis finished ({completed}/{total})...")
+            progress_placeholder.progress(50 + int(30 * completed / total))
         
-        # Step 9: Combine predictions
-        status_placeholder.text("Combining predictions...")
-        progress_placeholder.progress(80)
-        mean_analyzer = MeanAnalyzer(data_dir="data")
-        mean_visualizer = MeanVisualizer(analyzer=mean_analyzer)
+        # Step 9: Combine predictions once every agent has finished
+        def combining():
+            status_placeholder.text("Combining predictions...")
+            progress_placeholder.progress(80)
         
-        mean_predictions = {}
-        for timeframe in mean_analyzer.PREDICTION_TIMEFRAMES:
-            try:
-                mean_predictions[timeframe] = mean_analyzer.combine_predictions(symbol, timeframe)
-                mean_visualizer.plot_mean_prediction(symbol, timeframe, chart_data[timeframe])
-            except Exception as e:
-                print(f"Error with {timeframe}: {e}")
+        # One event loop runs every step, from the first download to the last mean prediction chart
+        chart_data, analyses, agent_results, mean_predictions = asyncio.run(
+            run_pipeline(
+                chart_scraper, mean_analyzer, mean_visualizer, symbol,
+                on_data=data_gathered, on_agent=agent_finished, on_combine=combining,
+            )
+        )
         
         # Step 10: Create interactive chart
         status_placeholder.text("Creating interactive chart...")
@@ -307,12 +315,9 @@ def start_analysis(symbol):
         # Prepare result
         results = {
             "symbol": symbol,
-            "chart_data": {timeframe: chart_data[timeframe].to_dict() for timeframe in chart_data},
-            "volume_profile_analysis": volume_profile_analysis,
-            "news_sentiment_analysis": news_sentiment_analysis,
-            "deepseek_result": deepseek_result,
-            "gemini_result": gemini_result,
-            "groq_result": groq_result,
+            "chart_data": chart_data,
+            **analyses,
+            **agent_results,
             "mean_predictions": mean_predictions,
             "interactive_chart_path": interactive_chart.get("html_path"),
             "timestamp": datetime.now().isoformat(),
@@ -333,6 +338,7 @@ def start_analysis(symbol):
         
     except Exception as e:
         # Handle errors
+        logger.error("[%s] Analysis failed: %s", symbol, e)
         st.session_state.status = f"Error: {str(e)}"
         st.session_state.progress = 0
         st.session_state.analysis_running = False
@@ -1,25 +1,44 @@
-import requests
 import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from tools.alpha_vantage import session
 from tools.volume_profile.agno_tool import ALPHA_VANTAGE_API_KEY
 
-def test_alpha_vantage(symbol, interval="5min"):
+def intraday_url(symbol, interval="5min"):
+    """
+    Build the Alpha Vantage intraday data URL for a symbol and interval
+    
+    Args:
+        symbol: The symbol to query
+        interval: Time interval between data points (1min, 5min, 15min, 30min, 60min)
+    """
+    return f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval={interval}&outputsize=full&adjusted=true&extended_hours=true&apikey={ALPHA_VANTAGE_API_KEY}"
+
+def fetch_intraday(symbol, interval="5min"):
+    """
+    Get intraday data from Alpha Vantage over the shared keep-alive session
+    
+    Args:
+        symbol: The symbol to query
+        interval: Time interval between data points (1min, 5min, 15min, 30min, 60min)
+    """
+    return session.get(intraday_url(symbol, interval), timeout=30).json()
+
+def test_alpha_vantage(symbol, interval="5min", data=None):
     """
     Test the Alpha Vantage API for a specific symbol and interval
     
     Args:
         symbol: The symbol to test
         interval: Time interval between data points (1min, 5min, 15min, 30min, 60min)
+        data: Response fetched already with fetch_intraday (fetched here if not provided)
     """
-    # Alpha Vantage API endpoint for intraday data
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval={interval}&outputsize=full&adjusted=true&extended_hours=true&apikey={ALPHA_VANTAGE_API_KEY}"
-    
     print(f"Testing Alpha Vantage API for symbol {symbol} with interval {interval}...")
-    print(f"URL: {url}")
+    print(f"URL: {intraday_url(symbol, interval)}")
     
     # Get data from Alpha Vantage
-    response = requests.get(url)
-    data = response.json()
+    if data is None:
+        data = fetch_intraday(symbol, interval)
     
     # Check if there's an error
     if "Error Message" in data:
@@ -53,11 +72,12 @@ def test_alpha_vantage(symbol, interval="5min"):
     print(f"Last few rows:")
     print(df.tail())
 
-# Test QQQ (NASDAQ 100 ETF)
-test_alpha_vantage("QQQ", "5min")
+# Test QQQ (NASDAQ 100 ETF), SPY (S&P 500 ETF) and DIA (Dow Jones ETF)
+symbols = ["QQQ", "SPY", "DIA"]
 
-# Test SPY (S&P 500 ETF)
-test_alpha_vantage("SPY", "5min")
+# Fetch all symbols concurrently, then print the results in order
+with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+    responses = list(executor.map(fetch_intraday, symbols))
 
-# Test DIA (Dow Jones ETF)
-test_alpha_vantage("DIA", "5min")
+for symbol, data in zip(symbols, responses):
+    test_alpha_vantage(symbol, "5min", data=data)
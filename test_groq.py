@@ -1,12 +1,9 @@
 import os
+from dotenv import dotenv_values
 from groq import Groq
 
 # Get the API key from the .env file
-with open(os.path.join("agents", ".env"), "r") as f:
-    for line in f:
-        if line.startswith("GROQ_API_KEY="):
-            groq_api_key = line.strip().split("=")[1]
-            break
+groq_api_key = dotenv_values(os.path.join("agents", ".env")).get("GROQ_API_KEY")
 
 print(f"Using Groq API key: {groq_api_key}")
 
@@ -1,14 +1,10 @@
 from agno.agent import Agent
 from agno.models.groq import Groq
 import os
+from dotenv import load_dotenv
 
-# Get the API key from the .env file
-with open(os.path.join("agents", ".env"), "r") as f:
-    for line in f:
-        if line.startswith("GROQ_API_KEY="):
-            groq_api_key = line.strip().split("=")[1]
-            os.environ["GROQ_API_KEY"] = groq_api_key
-            break
+# Load the API key from the .env file into the environment
+load_dotenv(os.path.join("agents", ".env"))
 
 # Initialize the agent
 agent = Agent(
@@ -0,0 +1,32 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any
+from tools.cache import ttl_cache
+
+# Alpha Vantage base URL
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+# Shared session for all Alpha Vantage calls, keeping connections alive and
+# retrying throttled or failed requests with exponential backoff
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+@ttl_cache(cacheable=lambda data: not ({"Error Message", "Information", "Note"} & data.keys()))
+def fetch_alpha_vantage(url: str) -> Dict[str, Any]:
+    """
+    Fetch a response from the Alpha Vantage API, reusing recent responses
+    
+    Error and rate limit responses are not cached.
+    
+    Args:
+        url: The Alpha Vantage query URL
+        
+    Returns:
+        Decoded JSON response
+    """
+    return session.get(url, timeout=30).json()
@@ -0,0 +1,134 @@
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+import contextlib
+import threading
+import functools
+from typing import Any, Callable, Optional, Tuple
+
+# Directory for cached responses and how long they stay fresh (in seconds)
+CACHE_DIR = os.path.join("data", "cache")
+CACHE_TTL = 300
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a cache key from the name and arguments of a call
+    
+    Args:
+        parts: Values that determine the result (function name, symbol, interval)
+    
+    Returns:
+        Hex digest identifying the call
+    """
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+def load_cached(key: str) -> Optional[Tuple[float, Any]]:
+    """
+    Load a cached entry from disk
+    
+    Args:
+        key: Cache key of the call
+    
+    Returns:
+        Tuple of (timestamp, value), or None if nothing usable is cached
+    """
+    try:
+        with open(os.path.join(CACHE_DIR, f"{key}.pkl"), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+def save_cached(key: str, entry: Tuple[float, Any]) -> None:
+    """
+    Save a cache entry to disk atomically
+    
+    Args:
+        key: Cache key of the call
+        entry: Tuple of (timestamp, value)
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(CACHE_DIR, f"{key}.pkl"))
+    except Exception:
+        # An unpicklable value or a full disk only costs the on-disk copy
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+
+def ttl_cache(ttl: int = CACHE_TTL, cacheable: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """
+    Memoize a function in memory and on disk for a limited time
+    
+    Results are shared between threads of the process and between processes
+    through CACHE_DIR, so repeated runs within the TTL skip the network call.
+    Concurrent calls with the same arguments wait for the first one instead of
+    repeating it, so the agents and the app fetching the same data at once
+    make a single request.
+    
+    Args:
+        ttl: Number of seconds a result stays fresh
+        cacheable: Predicate deciding whether a result may be cached (errors should not be)
+    
+    Returns:
+        Decorator applying the cache
+    """
+    def decorator(func: Callable) -> Callable:
+        memory = {}
+        # Per-key lock and number of callers waiting on it, for calls in progress
+        in_flight = {}
+        lock = threading.Lock()
+        name = f"{func.__module__}.{func.__qualname__}"
+        
+        def lookup(key):
+            """Fresh cached value of a call as a 1-tuple, or None"""
+            # Check memory first, then the on-disk copy from earlier runs
+            with lock:
+                entry = memory.get(key)
+            if entry is None:
+                entry = load_cached(key)
+            if entry is not None and time.time() - entry[0] < ttl:
+                with lock:
+                    memory[key] = entry
+                return (entry[1],)
+            return None
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(name, args, sorted(kwargs.items()))
+            
+            cached = lookup(key)
+            if cached is not None:
+                return cached[0]
+            
+            with lock:
+                pending = in_flight.setdefault(key, [threading.Lock(), 0])
+                pending[1] += 1
+            try:
+                with pending[0]:
+                    # Another caller may have finished the same call while this one waited
+                    cached = lookup(key)
+                    if cached is not None:
+                        return cached[0]
+                    
+                    value = func(*args, **kwargs)
+                    if cacheable is None or cacheable(value):
+                        entry = (time.time(), value)
+                        with lock:
+                            # Evict expired entries so calls with many distinct arguments don't pile up
+                            for stale in [k for k, (saved, _) in memory.items() if entry[0] - saved >= ttl]:
+                                del memory[stale]
+                            memory[key] = entry
+                        save_cached(key, entry)
+                    return value
+            finally:
+                with lock:
+                    pending[1] -= 1
+                    if not pending[1]:
+                        del in_flight[key]
+        
+        return wrapper
+    return decorator
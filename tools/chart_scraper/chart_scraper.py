@@ -1,9 +1,25 @@
 import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from datetime import datetime, timedelta
 import os
 from typing import List, Dict, Any, Optional, Tuple, Union
+from tools.cache import ttl_cache
+
+@ttl_cache(cacheable=lambda data: not data.empty)
+def download_ticker_data(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    """
+    Download ticker data from Yahoo Finance, reusing recent downloads
+    
+    Args:
+        ticker: The Yahoo Finance ticker
+        period: The period to download
+        interval: The interval between data points
+        
+    Returns:
+        DataFrame containing the ticker data
+    """
+    return yf.download(ticker, period=period, interval=interval, progress=False)
 
 class ChartScraper:
     """
@@ -59,16 +75,15 @@ class ChartScraper:
         period = self.TIMEFRAMES[timeframe]["period"]
         interval = self.TIMEFRAMES[timeframe]["interval"]
         
-        # Get data from yfinance
-        data = yf.download(ticker, period=period, interval=interval, progress=False)
+        # Get data from yfinance (cached for a few minutes)
+        data = download_ticker_data(ticker, period, interval)
         
         # Print the number of data points for debugging
         print(f"Downloaded {len(data)} data points for {symbol} {timeframe} (interval: {interval})")
         
-        # Save data to CSV
+        # Save data to Parquet, which keeps the dtypes and is much faster to write and read than CSV
         os.makedirs(os.path.join(self.data_dir, symbol), exist_ok=True)
-        csv_path = os.path.join(self.data_dir, symbol, f"{timeframe}.csv")
-        data.to_csv(csv_path)
+        data.to_parquet(self.get_data_path(symbol, timeframe))
         
         return data
     
@@ -87,22 +102,30 @@ class ChartScraper:
             result[timeframe] = self.get_ticker_data(symbol, timeframe)
         return result
     
-    def plot_chart(self, symbol: str, timeframe: str, save: bool = True) -> plt.Figure:
+    def plot_chart(self, symbol: str, timeframe: str, save: bool = True,
+                   data: Optional[pd.DataFrame] = None) -> Figure:
         """
         Plot an advanced chart for a specific symbol and timeframe
         
+        The figure is built with the object-oriented Matplotlib API rather than
+        pyplot, so it holds no global state and charts can be plotted from
+        several threads at once.
+        
         Args:
             symbol: The futures symbol (NQ, ES, YM)
             timeframe: The timeframe to plot
             save: Whether to save the chart to disk
+            data: Previously fetched ticker data (downloaded if not provided)
             
         Returns:
             Matplotlib figure object
         """
-        data = self.get_ticker_data(symbol, timeframe)
+        if data is None:
+            data = self.get_ticker_data(symbol, timeframe)
         
         # Create figure with 2 subplots (price and volume)
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 1]}, sharex=True)
+        fig = Figure(figsize=(12, 8))
+        ax1, ax2 = fig.subplots(2, 1, gridspec_kw={'height_ratios': [3, 1]}, sharex=True)
         
         # Plot the price data (OHLC)
         ax1.plot(data.index, data['Close'], label=f"{symbol} Close Price", color='blue')
@@ -142,7 +165,7 @@ class ChartScraper:
         fig.autofmt_xdate()
         
         # Adjust layout
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save the figure if requested
         if save:
@@ -154,16 +177,16 @@ class ChartScraper:
     
     def get_data_path(self, symbol: str, timeframe: str) -> str:
         """
-        Get the path to the CSV file for a specific symbol and timeframe
+        Get the path to the Parquet file for a specific symbol and timeframe
         
         Args:
             symbol: The futures symbol (NQ, ES, YM)
             timeframe: The timeframe
             
         Returns:
-            Path to the CSV file
+            Path to the Parquet file
         """
-        return os.path.join(self.data_dir, symbol, f"{timeframe}.csv")
+        return os.path.join(self.data_dir, symbol, f"{timeframe}.parquet")
     
     def get_chart_path(self, symbol: str, timeframe: str) -> str:
         """
@@ -13,6 +13,9 @@ class MeanAnalyzer:
     # Timeframes for predictions
     PREDICTION_TIMEFRAMES = ["intraday", "5d", "30d"]
     
+    # Agents whose predictions are combined
+    AGENTS = ["deepseek", "gemini", "groq"]
+    
     def __init__(self, data_dir: str = "data"):
         """
         Initialize the MeanAnalyzer
@@ -23,6 +26,46 @@ class MeanAnalyzer:
         self.data_dir = data_dir
         self.mean_analysis_dir = os.path.join(data_dir, "mean_analysis")
         os.makedirs(self.mean_analysis_dir, exist_ok=True)
+        
+        # Combined predictions keyed by (symbol, timeframe), with the signature of the agent files they came from
+        self._combined = {}
+    
+    def get_agent_prediction_path(self, agent: str, symbol: str, timeframe: str) -> str:
+        """
+        Get the path to the prediction file of a specific agent
+        
+        Args:
+            agent: The agent name (deepseek, gemini, groq)
+            symbol: The futures symbol (NQ, ES, YM)
+            timeframe: The timeframe
+            
+        Returns:
+            Path to the agent prediction file
+        """
+        return os.path.join(self.data_dir, "predictions", agent, symbol, f"{timeframe}.json")
+    
+    def prediction_signature(self, symbol: str, timeframe: str) -> Tuple:
+        """
+        Get the modification time and size of each agent prediction file
+        
+        Agents replace their prediction files atomically, so an unchanged
+        signature means the combined prediction is still current.
+        
+        Args:
+            symbol: The futures symbol (NQ, ES, YM)
+            timeframe: The timeframe
+            
+        Returns:
+            Tuple identifying the current agent predictions
+        """
+        signature = []
+        for agent in self.AGENTS:
+            try:
+                stat = os.stat(self.get_agent_prediction_path(agent, symbol, timeframe))
+                signature.append((agent, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((agent, None, None))
+        return tuple(signature)
     
     def load_agent_prediction(self, agent: str, symbol: str, timeframe: str) -> Dict[str, Any]:
         """
@@ -36,7 +79,7 @@ class MeanAnalyzer:
         Returns:
             Dictionary containing the prediction
         """
-        prediction_path = os.path.join(self.data_dir, "predictions", agent, symbol, f"{timeframe}.json")
+        prediction_path = self.get_agent_prediction_path(agent, symbol, timeframe)
         
         if not os.path.exists(prediction_path):
             # If the prediction file doesn't exist, create a default one for Groq
@@ -79,11 +122,28 @@ class MeanAnalyzer:
         Returns:
             Dictionary containing the combined prediction
         """
-        agents = ["deepseek", "gemini", "groq"]
+        # Reuse the last combination if no agent prediction changed since
+        signature = self.prediction_signature(symbol, timeframe)
+        cached = self._combined.get((symbol, timeframe))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        # Otherwise reuse the saved mean prediction if it is newer than every agent prediction
+        mean_prediction_path = self.get_mean_prediction_path(symbol, timeframe)
+        agent_mtimes = [mtime for _, mtime, _ in signature if mtime is not None]
+        try:
+            if agent_mtimes and os.stat(mean_prediction_path).st_mtime_ns > max(agent_mtimes):
+                with open(mean_prediction_path, "r") as f:
+                    mean_prediction = json.load(f)
+                self._combined[(symbol, timeframe)] = (signature, mean_prediction)
+                return mean_prediction
+        except (OSError, ValueError):
+            pass
+        
         predictions = {}
         
         # Load predictions from all agents
-        for agent in agents:
+        for agent in self.AGENTS:
             try:
                 predictions[agent] = self.load_agent_prediction(agent, symbol, timeframe)
             except FileNotFoundError:
@@ -126,11 +186,11 @@ class MeanAnalyzer:
         
         # Save mean prediction to file
         os.makedirs(os.path.join(self.mean_analysis_dir, symbol), exist_ok=True)
-        mean_prediction_path = os.path.join(self.mean_analysis_dir, symbol, f"{timeframe}.json")
         
         with open(mean_prediction_path, "w") as f:
             json.dump(mean_prediction, f, indent=2)
         
+        self._combined[(symbol, timeframe)] = (signature, mean_prediction)
         return mean_prediction
     
     def get_mean_prediction_path(self, symbol: str, timeframe: str) -> str:
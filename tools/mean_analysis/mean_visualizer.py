@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from typing import Dict, Any, List, Optional, Tuple, Union
 import os
 from datetime import datetime
@@ -24,10 +24,13 @@ class MeanVisualizer:
         self.analyzer = analyzer
         self.mean_analysis_dir = analyzer.mean_analysis_dir
     
-    def plot_mean_prediction(self, symbol: str, timeframe: str, chart_data: pd.DataFrame, save: bool = True) -> plt.Figure:
+    def plot_mean_prediction(self, symbol: str, timeframe: str, chart_data: pd.DataFrame, save: bool = True) -> Figure:
         """
         Plot a chart with mean prediction signals and future price forecast
         
+        The figure is built with the object-oriented Matplotlib API rather than
+        pyplot, so charts of several timeframes can be plotted from separate threads.
+        
         Args:
             symbol: The futures symbol (NQ, ES, YM)
             timeframe: The timeframe to plot
@@ -45,7 +48,8 @@ class MeanVisualizer:
             mean_prediction = {"prediction_label": "Hold", "signal_strength": 0}
         
         # Create figure and axis
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
         
         # Plot the closing price
         ax.plot(chart_data.index, chart_data['Close'], label=f"{symbol} Close Price")
@@ -209,13 +213,17 @@ class MeanVisualizer:
         
         return fig
     
-    def create_interactive_chart(self, symbol: str, save: bool = True) -> Dict[str, Any]:
+    def create_interactive_chart(self, symbol: str, save: bool = True,
+                                 volume_profile_analysis: Optional[str] = None,
+                                 news_sentiment_analysis: Optional[str] = None) -> Dict[str, Any]:
         """
         Create an interactive chart with tabs for different timeframes
         
         Args:
             symbol: The futures symbol (NQ, ES, YM)
             save: Whether to save the chart to disk
+            volume_profile_analysis: Volume profile analysis already computed for this run (fetched if not provided)
+            news_sentiment_analysis: News sentiment analysis already computed for this run (fetched if not provided)
             
         Returns:
             Dictionary containing paths to the charts
@@ -633,17 +641,19 @@ class MeanVisualizer:
                     mean_prediction = self.analyzer.combine_predictions(symbol, timeframe)
                     agent_predictions = mean_prediction.get("agent_predictions", {})
                     
-                    # Get volume profile analysis
-                    try:
-                        volume_profile_analysis = get_volume_profile(symbol)
-                    except Exception as e:
-                        volume_profile_analysis = f"Error loading volume profile analysis: {str(e)}"
+                    # Get volume profile analysis (once, it is the same for every timeframe)
+                    if volume_profile_analysis is None:
+                        try:
+                            volume_profile_analysis = get_volume_profile(symbol)
+                        except Exception as e:
+                            volume_profile_analysis = f"Error loading volume profile analysis: {str(e)}"
                     
-                    # Get news sentiment analysis
-                    try:
-                        news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
-                    except Exception as e:
-                        news_sentiment_analysis = f"Error loading news sentiment analysis: {str(e)}"
+                    # Get news sentiment analysis (once, it is the same for every timeframe)
+                    if news_sentiment_analysis is None:
+                        try:
+                            news_sentiment_analysis = get_alpha_vantage_sentiment(symbol)
+                        except Exception as e:
+                            news_sentiment_analysis = f"Error loading news sentiment analysis: {str(e)}"
                     
                     html_content += f"""
                     <div id="{timeframe}" class="tabcontent" style="display: {display};">
@@ -749,3 +759,24 @@ class MeanVisualizer:
             result["html_path"] = html_path
         
         return result
+
+def render_mean_prediction(data_dir: str, symbol: str, timeframe: str, chart_data: pd.DataFrame) -> str:
+    """
+    Plot and save a mean prediction chart, for use in a worker process
+    
+    Rendering is CPU-bound, so running it in separate processes lets the charts
+    of several timeframes render in parallel. The mean prediction is read from
+    the file saved by the parent's combine_predictions call.
+    
+    Args:
+        data_dir: Directory containing the prediction data
+        symbol: The futures symbol (NQ, ES, YM)
+        timeframe: The timeframe to plot
+        chart_data: DataFrame containing the chart data
+        
+    Returns:
+        Path to the saved chart image
+    """
+    visualizer = MeanVisualizer(analyzer=MeanAnalyzer(data_dir=data_dir))
+    visualizer.plot_mean_prediction(symbol, timeframe, chart_data)
+    return visualizer.analyzer.get_chart_path(symbol, timeframe)
@@ -1,8 +1,8 @@
-import requests
 import pandas as pd
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
+from tools.alpha_vantage import fetch_alpha_vantage
 
 class AlphaVantageSentimentAnalyzer:
     """
@@ -54,9 +54,8 @@ class AlphaVantageSentimentAnalyzer:
         # Alpha Vantage API endpoint for news sentiment
         url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&keywords={keywords}&time_from={time_from}&time_to={time_to}&limit={limit}&apikey={self.api_key}"
         
-        # Get data from Alpha Vantage
-        response = requests.get(url)
-        data = response.json()
+        # Get data from Alpha Vantage (cached for a few minutes)
+        data = fetch_alpha_vantage(url)
         
         # Check if there's an error
         if "Error Message" in data:
@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Optional
 import os
 import json
+from tools.cache import ttl_cache
 from .volume_profile import VolumeProfileAnalyzer
 
 # Get Alpha Vantage API key from environment variables
@@ -9,6 +10,12 @@ ALPHA_VANTAGE_API_KEY = os.environ.get("ALPHA_VANTAGE_API_KEY", "4M6VASN5R8SRDP2
 # Create a single instance of the VolumeProfileAnalyzer
 _analyzer = VolumeProfileAnalyzer(api_key=ALPHA_VANTAGE_API_KEY, data_dir="data")
 
+# The analysis pipeline and the agents ask for the same volume profile at the same time,
+# so the formatted analysis is cached and computed once (unavailable data is retried)
+@ttl_cache(cacheable=lambda text: "No volume profile data available" not in text)
+def _formatted_volume_profile(symbol: str, interval: str) -> str:
+    return _analyzer.format_volume_profile_for_agents(symbol, interval)
+
 def get_volume_profile(symbol: str, interval: str = "60min") -> str:
     """Get volume profile analysis for a specific symbol and interval.
     
@@ -19,7 +26,7 @@ def get_volume_profile(symbol: str, interval: str = "60min") -> str:
     Returns:
         String containing volume profile analysis
     """
-    return _analyzer.format_volume_profile_for_agents(symbol, interval)
+    return _formatted_volume_profile(symbol, interval)
 
 def analyze_volume_profile(symbol: str, interval: str = "5min") -> Dict[str, Any]:
     """Analyze volume profile for a specific symbol and interval.
@@ -1,10 +1,34 @@
 import pandas as pd
 import numpy as np
-import requests
-import matplotlib.pyplot as plt
-from typing import Dict, Any, List, Optional, Tuple, Union
+from matplotlib.figure import Figure
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 import os
+import tempfile
+import contextlib
 from datetime import datetime, timedelta
+from tools.alpha_vantage import fetch_alpha_vantage
+
+def write_atomic(path: str, write: Callable[[str], None]) -> None:
+    """
+    Write a file atomically
+    
+    The content is written to a temporary file in the same directory and then
+    moved over the target with os.replace, so concurrent callers writing the
+    same file never interleave and readers never see a partial file.
+    
+    Args:
+        path: Destination file path
+        write: Function writing the content to the temporary path it is given
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
 
 class VolumeProfileAnalyzer:
     """
@@ -52,9 +76,8 @@ class VolumeProfileAnalyzer:
         # Alpha Vantage API endpoint for intraday data
         url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={ticker}&interval={interval}&outputsize={output_size}&adjusted={str(adjusted).lower()}&extended_hours={str(extended_hours).lower()}&apikey={self.api_key}"
         
-        # Get data from Alpha Vantage
-        response = requests.get(url)
-        data = response.json()
+        # Get data from Alpha Vantage (cached for a few minutes)
+        data = fetch_alpha_vantage(url)
         
         # Check if there's an error
         if "Error Message" in data:
@@ -95,7 +118,7 @@ class VolumeProfileAnalyzer:
         # Save data to CSV
         os.makedirs(os.path.join(self.data_dir, symbol, "volume_profile"), exist_ok=True)
         csv_path = os.path.join(self.data_dir, symbol, "volume_profile", f"intraday_{interval}.csv")
-        df.to_csv(csv_path)
+        write_atomic(csv_path, df.to_csv)
         
         return df
     
@@ -193,10 +216,13 @@ class VolumeProfileAnalyzer:
         
         return volume_profile
     
-    def plot_volume_profile(self, symbol: str, data: pd.DataFrame, volume_profile: pd.DataFrame, save: bool = True) -> plt.Figure:
+    def plot_volume_profile(self, symbol: str, data: pd.DataFrame, volume_profile: pd.DataFrame, save: bool = True) -> Figure:
         """
         Plot volume profile alongside price chart
         
+        The figure is built with the object-oriented Matplotlib API rather than
+        pyplot, so the agents can plot volume profiles from separate threads.
+        
         Args:
             symbol: The futures symbol (NQ, ES, YM)
             data: DataFrame containing price data
@@ -207,7 +233,8 @@ class VolumeProfileAnalyzer:
             Matplotlib figure object
         """
         # Create figure with 2 subplots (price and volume profile)
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 8), gridspec_kw={'width_ratios': [3, 1]})
+        fig = Figure(figsize=(15, 8))
+        ax1, ax2 = fig.subplots(1, 2, gridspec_kw={'width_ratios': [3, 1]})
         
         # Check if data is empty
         if data.empty:
@@ -222,13 +249,13 @@ class VolumeProfileAnalyzer:
             fig.suptitle(f"No Data Available for {symbol}", fontsize=16)
             
             # Adjust layout
-            plt.tight_layout()
+            fig.tight_layout()
             
             # Save the figure if requested
             if save:
                 os.makedirs(os.path.join(self.data_dir, symbol, "volume_profile", "charts"), exist_ok=True)
                 fig_path = os.path.join(self.data_dir, symbol, "volume_profile", "charts", "volume_profile.png")
-                fig.savefig(fig_path)
+                write_atomic(fig_path, lambda tmp_path: fig.savefig(tmp_path, format="png"))
             
             return fig
         
@@ -270,13 +297,13 @@ class VolumeProfileAnalyzer:
         ax2.legend(handles=legend_elements, loc='upper right')
         
         # Adjust layout
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save the figure if requested
         if save:
             os.makedirs(os.path.join(self.data_dir, symbol, "volume_profile", "charts"), exist_ok=True)
             fig_path = os.path.join(self.data_dir, symbol, "volume_profile", "charts", "volume_profile.png")
-            fig.savefig(fig_path)
+            write_atomic(fig_path, lambda tmp_path: fig.savefig(tmp_path, format="png"))
         
         return fig
     